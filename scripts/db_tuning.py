@@ -0,0 +1,30 @@
+"""
+Shared DuckDB Connection Tuning
+
+Single home for the thread/memory pragmas applied by the pipeline
+scripts, so tuning changes land in one place instead of being copied
+into every script.
+"""
+
+import os
+
+import duckdb
+
+
+def tune_connection(conn: duckdb.DuckDBPyConnection):
+    """Apply thread/memory tuning pragmas, overridable via environment.
+
+    DUCKDB_THREADS defaults to all cores so scans and aggregations
+    parallelize; DUCKDB_MEMORY_LIMIT and DUCKDB_TEMP_DIRECTORY are only
+    set when provided (e.g. to keep spills off a slow temp disk).
+    """
+    threads = os.environ.get("DUCKDB_THREADS") or os.cpu_count()
+    conn.execute(f"PRAGMA threads={threads}")
+
+    memory_limit = os.environ.get("DUCKDB_MEMORY_LIMIT")
+    if memory_limit:
+        conn.execute(f"PRAGMA memory_limit='{memory_limit}'")
+
+    temp_directory = os.environ.get("DUCKDB_TEMP_DIRECTORY")
+    if temp_directory:
+        conn.execute(f"PRAGMA temp_directory='{temp_directory}'")
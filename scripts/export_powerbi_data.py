@@ -1,11 +1,11 @@
 """
-Export Power BI Views to CSV
+Export Power BI Views to Parquet
 
-This script exports Power BI-ready views from DuckDB to CSV files
+This script exports the Power BI-ready tables from DuckDB to Parquet files
 for use in Power BI dashboards.
 
 Prerequisites:
-    - Run materialize_tables.py first to create the base tables
+    - Run materialize_tables.py first to create the base and Power BI tables
 
 Usage:
     python scripts/export_powerbi_data.py
@@ -13,66 +13,94 @@ Usage:
     uv run python scripts/export_powerbi_data.py
 """
 
-import os
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 import duckdb
-import pandas as pd
+
+from db_tuning import tune_connection
 
 
 # Configuration
 PROJECT_ROOT = Path(__file__).parent.parent
 DB_PATH = PROJECT_ROOT / "analytics.duckdb"
 OUTPUT_DIR = PROJECT_ROOT / "data" / "powerbi"
-SQL_DIR = PROJECT_ROOT / "sql" / "analytics"
 
-# Views to export: (view_name, output_filename)
+# Output format: Parquet reads much faster in Power BI than CSV and is
+# ~5x smaller thanks to columnar Snappy compression
+EXPORT_FORMAT = "FORMAT PARQUET, COMPRESSION SNAPPY, ROW_GROUP_SIZE 100000"
+
+# Tables to export: (table_name, output_filename)
+# These are materialized by materialize_tables.py (08_powerbi_tables.sql),
+# so the export only pays for the COPY, not for recomputing the CTE graph
 VIEWS_TO_EXPORT = [
-    ("v_funnel_metrics", "funnel_metrics.csv"),
-    ("v_cohort_retention", "cohort_retention.csv"),
-    ("v_ab_test_summary", "ab_test_summary.csv"),
+    ("v_funnel_metrics", "funnel_metrics.parquet"),
+    ("v_cohort_retention", "cohort_retention.parquet"),
+    ("v_ab_test_summary", "ab_test_summary.parquet"),
 ]
 
+# Hive-partitioned datasets: (table_name, output_dirname, partition_column)
+# Partitioning cohort retention by cohort_week lets Power BI incremental
+# refresh and DuckDB partition pruning touch only the newest cohorts, so
+# refresh bandwidth scales with new data instead of total history
+PARTITIONED_EXPORTS = [
+    ("v_cohort_retention", "cohort_retention", "cohort_week"),
+]
 
-def create_views(conn):
-    """Create Power BI views from SQL file."""
-    sql_file = SQL_DIR / "08_powerbi_views.sql"
-    
-    print(f"Creating views from: {sql_file}")
-    
-    with open(sql_file, 'r', encoding='utf-8') as f:
-        content = f.read()
-    
-    # Split into individual statements (CREATE VIEW statements)
-    # Remove comments and find CREATE statements
-    statements = []
-    current_stmt = []
-    
-    for line in content.split('\n'):
-        stripped = line.strip()
-        # Skip pure comment lines at statement start
-        if not current_stmt and stripped.startswith('--'):
-            continue
-        
-        current_stmt.append(line)
-        
-        # End of statement
-        if stripped.endswith(';'):
-            stmt = '\n'.join(current_stmt).strip()
-            # Only keep CREATE VIEW statements
-            if 'CREATE OR REPLACE VIEW' in stmt.upper():
-                statements.append(stmt)
-            current_stmt = []
-    
-    # Execute each CREATE VIEW statement
-    for stmt in statements:
-        # Extract view name for logging
-        view_name = stmt.split('VIEW')[1].split('AS')[0].strip()
-        conn.execute(stmt)
-        print(f"  [OK] Created view: {view_name}")
+
+def export_view(view_name: str, output_filename: str) -> int:
+    """Export one Power BI table to OUTPUT_DIR on its own read-only connection.
+
+    Each worker gets a private connection so the three exports can run
+    concurrently (DuckDB releases the GIL during query execution).
+
+    Returns:
+        Row count of the exported view
+    """
+    output_path = OUTPUT_DIR / output_filename
+
+    conn = duckdb.connect(str(DB_PATH), read_only=True)
+    try:
+        tune_connection(conn)
+        row_count = conn.execute(f"SELECT COUNT(*) FROM {view_name}").fetchone()[0]
+
+        # COPY keeps the export inside DuckDB's vectorized engine
+        conn.execute(
+            f"COPY {view_name} TO '{output_path.as_posix()}' ({EXPORT_FORMAT})"
+        )
+    finally:
+        conn.close()
+
+    return row_count
+
+
+def export_partitioned(view_name: str, output_dirname: str, partition_column: str) -> int:
+    """Export one table as a Hive-partitioned Parquet dataset.
+
+    OVERWRITE_OR_IGNORE makes the COPY idempotent: existing partition
+    directories are rewritten in place rather than erroring.
+
+    Returns:
+        Row count of the exported view
+    """
+    output_path = OUTPUT_DIR / output_dirname
+
+    conn = duckdb.connect(str(DB_PATH), read_only=True)
+    try:
+        tune_connection(conn)
+        row_count = conn.execute(f"SELECT COUNT(*) FROM {view_name}").fetchone()[0]
+
+        conn.execute(
+            f"COPY {view_name} TO '{output_path.as_posix()}' "
+            f"({EXPORT_FORMAT}, PARTITION_BY ({partition_column}), OVERWRITE_OR_IGNORE)"
+        )
+    finally:
+        conn.close()
+
+    return row_count
 
 
 def main():
-    """Export Power BI views to CSV files."""
+    """Export Power BI views to Parquet files."""
     
     print("=" * 60)
     print("EXPORT POWER BI DATA")
@@ -83,57 +111,49 @@ def main():
     # Create output directory if it does not exist
     OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
     print(f"[OK] Output directory ready")
-    
-    # Connect to DuckDB (read-write to create views)
-    conn = duckdb.connect(str(DB_PATH))
-    print(f"[OK] Connected to database")
-    
-    print("\n" + "-" * 60)
-    print("Creating Power BI views...")
-    print("-" * 60)
-    
-    # Create views
-    create_views(conn)
-    
+
     print("\n" + "-" * 60)
-    print("Exporting views to CSV...")
+    print("Exporting views to Parquet...")
     print("-" * 60)
-    
-    # Export each view
-    for view_name, output_filename in VIEWS_TO_EXPORT:
-        output_path = OUTPUT_DIR / output_filename
-        
-        # Query the view
-        df = conn.execute(f"SELECT * FROM {view_name}").df()
-        
-        # Export to CSV
-        df.to_csv(output_path, index=False)
-        
-        print(f"[OK] {view_name} -> {output_filename} ({len(df):,} rows)")
-    
+
+    # Export the views concurrently, one read-only connection per worker
+    with ThreadPoolExecutor(max_workers=len(VIEWS_TO_EXPORT)) as executor:
+        row_counts = list(
+            executor.map(lambda vo: export_view(*vo), VIEWS_TO_EXPORT)
+        )
+
+    for (view_name, output_filename), row_count in zip(VIEWS_TO_EXPORT, row_counts):
+        print(f"[OK] {view_name} -> {output_filename} ({row_count:,} rows)")
+
+    # Partitioned datasets (folder targets for incremental BI refresh)
+    for view_name, output_dirname, partition_column in PARTITIONED_EXPORTS:
+        row_count = export_partitioned(view_name, output_dirname, partition_column)
+        print(f"[OK] {view_name} -> {output_dirname}/ "
+              f"(partitioned by {partition_column}, {row_count:,} rows)")
+
     # Validate cohort retention rates
     print("\n" + "-" * 60)
     print("Validating cohort retention data...")
     print("-" * 60)
-    
-    invalid_count = conn.execute("""
-        SELECT COUNT(*) FROM v_cohort_retention WHERE retention_rate > 1.0
-    """).fetchone()[0]
-    
-    if invalid_count > 0:
-        print(f"  [WARNING] Found {invalid_count} rows with retention_rate > 100%!")
-    else:
-        print("  [OK] All retention rates are valid (0-100%)")
-    
-    # Show sample stats
-    stats = conn.execute("""
-        SELECT 
+
+    conn = duckdb.connect(str(DB_PATH), read_only=True)
+
+    # Single scan: invalid-rate check and sample stats share one pass
+    invalid_count, min_rate, max_rate, avg_rate = conn.execute("""
+        SELECT
+            COUNT(*) FILTER (WHERE retention_rate > 1.0) AS invalid_count,
             MIN(retention_rate) AS min_rate,
             MAX(retention_rate) AS max_rate,
             AVG(retention_rate) AS avg_rate
         FROM v_cohort_retention
     """).fetchone()
-    print(f"  Retention rate range: {stats[0]:.2%} to {stats[1]:.2%} (avg: {stats[2]:.2%})")
+
+    if invalid_count > 0:
+        print(f"  [WARNING] Found {invalid_count} rows with retention_rate > 100%!")
+    else:
+        print("  [OK] All retention rates are valid (0-100%)")
+
+    print(f"  Retention rate range: {min_rate:.2%} to {max_rate:.2%} (avg: {avg_rate:.2%})")
     
     # Close connection
     conn.close()
@@ -9,82 +9,116 @@ This script executes SQL files to create analytics tables:
 5. cohort_retention - Retention counts by cohort and period
 6. cohort_sizes - Total users per cohort
 7. cohort_retention_rates - Final retention rates table
+8. v_funnel_metrics / v_cohort_retention / v_ab_test_summary /
+   v_ab_test_detailed - Materialized Power BI tables (v_* names kept
+   for BI compatibility)
 """
 
+import hashlib
+
 import duckdb
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
+from db_tuning import tune_connection
+
+
+# SQL files in dependency order, with the tables each one creates.
+# All statements run in a single transaction (one WAL flush, not one
+# per table) and row counts are probed with a single batched query.
+SQL_STEPS = [
+    ("01_sessionization.sql", ["user_sessions"]),
+    ("02_funnel.sql", ["funnel_sessions"]),
+    ("03_cohort_users.sql", ["cohort_users"]),
+    ("04_cohort_activity.sql", ["cohort_activity"]),
+    ("05_cohort_retention.sql", ["cohort_retention"]),
+    ("06_cohort_sizes.sql", ["cohort_sizes"]),
+    ("07_cohort_retention_rates.sql", ["cohort_retention_rates"]),
+    ("08_powerbi_tables.sql", ["v_funnel_metrics", "v_cohort_retention",
+                               "v_ab_test_summary", "v_ab_test_detailed"]),
+]
+
+ALL_TABLES = [table for _, tables in SQL_STEPS for table in tables]
+
 
 def load_sql_file(file_path: Path) -> str:
-    """Load SQL file content and fix DuckDB syntax for WITH + CREATE statements."""
-    with open(file_path, 'r', encoding='utf-8') as f:
-        content = f.read()
-    
-    # Find the validation queries section
-    validation_marker = '-- ============================================================================\n-- Validation'
-    if validation_marker in content:
-        sql_content = content.split(validation_marker)[0]
-    else:
-        # If no validation section, find the last semicolon
-        last_semicolon = content.rfind(';')
-        if last_semicolon != -1:
-            sql_content = content[:last_semicolon + 1]
-        else:
-            sql_content = content
-    
-    sql_content = sql_content.strip()
-    
-    # Fix DuckDB syntax: WITH clause must be inside CREATE, not before it
-    # Pattern: WITH ... ) CREATE OR REPLACE TABLE ... AS\nSELECT ...
-    # Should be: CREATE OR REPLACE TABLE ... AS (WITH ... SELECT ...)
-    
-    if 'WITH ' in sql_content.upper() and 'CREATE OR REPLACE TABLE' in sql_content.upper():
-        lines = sql_content.split('\n')
-        
-        # Find line with WITH (not in comment)
-        with_line_idx = -1
-        for i, line in enumerate(lines):
-            stripped = line.strip()
-            if stripped.upper().startswith('WITH ') and not stripped.startswith('--'):
-                with_line_idx = i
-                break
-        
-        # Find line with CREATE
-        create_line_idx = -1
-        for i, line in enumerate(lines):
-            if 'CREATE OR REPLACE TABLE' in line.upper() and not line.strip().startswith('--'):
-                create_line_idx = i
-                break
-        
-        if with_line_idx != -1 and create_line_idx != -1 and with_line_idx < create_line_idx:
-            # Extract WITH clause (from WITH line to line before CREATE)
-            with_lines = lines[with_line_idx:create_line_idx]
-            # Remove trailing blank lines and comments
-            while with_lines and (not with_lines[-1].strip() or with_lines[-1].strip().startswith('--')):
-                with_lines.pop()
-            with_clause = '\n'.join(with_lines).strip()
-            
-            # Extract CREATE statement
-            create_lines = lines[create_line_idx:]
-            create_part = '\n'.join(create_lines).strip()
-            
-            # Find "AS" in CREATE (should be on same line or next line after table name)
-            as_pos = create_part.upper().find(' AS\n')
-            if as_pos == -1:
-                as_pos = create_part.upper().find(' AS ')
-            
-            if as_pos != -1:
-                create_header = create_part[:as_pos + 3].strip()
-                select_part = create_part[as_pos + 3:].strip()
-                
-                # Remove trailing semicolon
-                if select_part.rstrip().endswith(';'):
-                    select_part = select_part.rstrip()[:-1].strip()
-                
-                # Reconstruct
-                sql_content = f"{create_header} (\n{with_clause}\n{select_part}\n)"
-    
-    return sql_content
+    """Load SQL file content.
+
+    The .sql files use DuckDB's native CREATE ... AS WITH ... syntax and
+    keep their validation queries commented out, so the content can be
+    executed as-is.
+    """
+    return file_path.read_text(encoding='utf-8')
+
+
+def drop_legacy_views(conn: duckdb.DuckDBPyConnection):
+    """Drop legacy v_* views so CREATE TABLE can replace them."""
+    legacy_views = conn.execute("""
+        SELECT table_name FROM information_schema.tables
+        WHERE table_type = 'VIEW' AND table_name LIKE 'v\\_%' ESCAPE '\\'
+    """).fetchall()
+    for (view_name,) in legacy_views:
+        conn.execute(f"DROP VIEW {view_name}")
+
+
+def raw_input_signature(conn: duckdb.DuckDBPyConnection) -> str:
+    """Signature of the raw source tables feeding the analytics chain."""
+    counts = conn.execute("""
+        SELECT
+            (SELECT COUNT(*) FROM users_raw),
+            (SELECT COUNT(*) FROM events_raw),
+            (SELECT COUNT(*) FROM orders_raw)
+    """).fetchone()
+    return "users={}|events={}|orders={}".format(*counts)
+
+
+def first_stale_step(conn: duckdb.DuckDBPyConnection, sqls: list) -> int:
+    """Index of the first SQL step that needs rebuilding, or len(SQL_STEPS).
+
+    A step is stale when its SQL hash or the raw-input signature differs
+    from the values recorded in _build_meta at the last build. Because
+    the steps form a dependency chain, everything from the first stale
+    step onward is rebuilt.
+    """
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS _build_meta (
+            name VARCHAR PRIMARY KEY,
+            sql_sha256 VARCHAR,
+            raw_signature VARCHAR,
+            built_at TIMESTAMP
+        )
+    """)
+
+    recorded = dict(conn.execute(
+        "SELECT name, sql_sha256 || '@' || raw_signature FROM _build_meta"
+    ).fetchall())
+    raw_signature = raw_input_signature(conn)
+
+    for i, ((filename, _), sql) in enumerate(zip(SQL_STEPS, sqls)):
+        sha = hashlib.sha256(sql.encode()).hexdigest()
+        if recorded.get(filename) != f"{sha}@{raw_signature}":
+            return i
+    return len(SQL_STEPS)
+
+
+def record_build_meta(conn: duckdb.DuckDBPyConnection, sqls: list, start: int):
+    """Upsert _build_meta rows for the steps rebuilt in this run."""
+    raw_signature = raw_input_signature(conn)
+    for (filename, _), sql in zip(SQL_STEPS[start:], sqls[start:]):
+        sha = hashlib.sha256(sql.encode()).hexdigest()
+        conn.execute(
+            "INSERT OR REPLACE INTO _build_meta VALUES (?, ?, ?, now())",
+            [filename, sha, raw_signature],
+        )
+
+
+def fetch_row_counts(conn: duckdb.DuckDBPyConnection) -> dict:
+    """Probe all table row counts in a single batched query."""
+    counts_sql = "SELECT " + ", ".join(
+        f"(SELECT COUNT(*) FROM {table})" for table in ALL_TABLES
+    )
+    counts = conn.execute(counts_sql).fetchone()
+    return dict(zip(ALL_TABLES, counts))
 
 
 def main():
@@ -92,141 +126,85 @@ def main():
     project_root = Path(__file__).parent.parent
     db_path = project_root / "analytics.duckdb"
     sql_dir = project_root / "sql" / "analytics"
-    
+
     print("=" * 60)
     print("MATERIALIZING ANALYTICS TABLES")
     print("=" * 60)
     print(f"Database: {db_path}")
     print(f"SQL Directory: {sql_dir}")
     print()
-    
+
     # Connect to DuckDB
     conn = duckdb.connect(str(db_path))
-    
-    # Table 1: user_sessions
-    print("Creating user_sessions table...")
-    print("  Source: sql/analytics/01_sessionization.sql")
-    sql_file = sql_dir / "01_sessionization.sql"
-    sql = load_sql_file(sql_file)
-    conn.execute(sql)
-    
-    row_count = conn.execute("SELECT COUNT(*) FROM user_sessions").fetchone()[0]
-    print(f"  [OK] Created user_sessions with {row_count:,} rows")
-    print()
-    
-    # Table 2: funnel_sessions
-    print("Creating funnel_sessions table...")
-    print("  Source: sql/analytics/02_funnel.sql")
-    sql_file = sql_dir / "02_funnel.sql"
-    sql = load_sql_file(sql_file)
-    conn.execute(sql)
-    
-    row_count = conn.execute("SELECT COUNT(*) FROM funnel_sessions").fetchone()[0]
-    print(f"  [OK] Created funnel_sessions with {row_count:,} rows")
-    print()
-    
-    # =========================================================================
-    # COHORT TABLES (User-based retention analysis)
-    # =========================================================================
-    
-    # Table 3: cohort_users
-    print("Creating cohort_users table...")
-    print("  Source: sql/analytics/03_cohort_users.sql")
-    sql_file = sql_dir / "03_cohort_users.sql"
-    sql = load_sql_file(sql_file)
-    conn.execute(sql)
-    
-    row_count = conn.execute("SELECT COUNT(*) FROM cohort_users").fetchone()[0]
-    print(f"  [OK] Created cohort_users with {row_count:,} rows")
-    print()
-    
-    # Table 4: cohort_activity
-    print("Creating cohort_activity table...")
-    print("  Source: sql/analytics/04_cohort_activity.sql")
-    sql_file = sql_dir / "04_cohort_activity.sql"
-    sql = load_sql_file(sql_file)
-    conn.execute(sql)
-    
-    row_count = conn.execute("SELECT COUNT(*) FROM cohort_activity").fetchone()[0]
-    print(f"  [OK] Created cohort_activity with {row_count:,} rows")
-    print()
-    
-    # Table 5: cohort_retention
-    print("Creating cohort_retention table...")
-    print("  Source: sql/analytics/05_cohort_retention.sql")
-    sql_file = sql_dir / "05_cohort_retention.sql"
-    sql = load_sql_file(sql_file)
-    conn.execute(sql)
-    
-    row_count = conn.execute("SELECT COUNT(*) FROM cohort_retention").fetchone()[0]
-    print(f"  [OK] Created cohort_retention with {row_count:,} rows")
-    print()
-    
-    # Table 6: cohort_sizes
-    print("Creating cohort_sizes table...")
-    print("  Source: sql/analytics/06_cohort_sizes.sql")
-    sql_file = sql_dir / "06_cohort_sizes.sql"
-    sql = load_sql_file(sql_file)
-    conn.execute(sql)
-    
-    row_count = conn.execute("SELECT COUNT(*) FROM cohort_sizes").fetchone()[0]
-    print(f"  [OK] Created cohort_sizes with {row_count:,} rows")
-    print()
-    
-    # Table 7: cohort_retention_rates
-    print("Creating cohort_retention_rates table...")
-    print("  Source: sql/analytics/07_cohort_retention_rates.sql")
-    sql_file = sql_dir / "07_cohort_retention_rates.sql"
-    sql = load_sql_file(sql_file)
-    conn.execute(sql)
-    
-    row_count = conn.execute("SELECT COUNT(*) FROM cohort_retention_rates").fetchone()[0]
-    print(f"  [OK] Created cohort_retention_rates with {row_count:,} rows")
+    tune_connection(conn)
+
+    # Migration guard for databases built before the Power BI views
+    # became materialized tables
+    drop_legacy_views(conn)
+
+    # Load all SQL in one parallel pass (reads overlap on slow/network
+    # disks), then run it as one transaction: one WAL flush instead of
+    # one implicit transaction per CREATE
+    with ThreadPoolExecutor() as executor:
+        sqls = list(executor.map(
+            load_sql_file, (sql_dir / filename for filename, _ in SQL_STEPS)
+        ))
+
+    # Fast path: skip steps whose SQL and raw inputs are unchanged
+    start = first_stale_step(conn, sqls)
+
+    if start == len(SQL_STEPS):
+        print("All analytics tables up to date (inputs unchanged), skipping rebuild")
+        print()
+    else:
+        print("Creating analytics tables (single transaction)...")
+        for filename, _ in SQL_STEPS[start:]:
+            print(f"  Source: sql/analytics/{filename}")
+        conn.execute("BEGIN;\n" + "\n".join(sqls[start:]) + "\nCOMMIT;")
+        record_build_meta(conn, sqls, start)
+        print()
+
+    # Probe all row counts in one query (neutral wording: on the fast
+    # path these tables were verified, not rebuilt)
+    row_counts = fetch_row_counts(conn)
+    for table in ALL_TABLES:
+        print(f"  [OK] {table}: {row_counts[table]:,} rows")
     print()
-    
+
     # =========================================================================
     # VALIDATION: Ensure retention rates are valid
     # =========================================================================
     print("Validating cohort retention rates...")
-    
-    # Check for any retention > 1 (should be 0)
-    invalid_count = conn.execute("""
-        SELECT COUNT(*) FROM cohort_retention_rates WHERE retention_rate > 1.0
-    """).fetchone()[0]
-    
+
+    # Single scan: invalid-rate check (should find 0 rows) and the week 0
+    # conversion stats share one pass over cohort_retention_rates
+    invalid_count, avg_week0, min_week0, max_week0 = conn.execute("""
+        SELECT
+            COUNT(*) FILTER (WHERE retention_rate > 1.0) AS invalid_count,
+            AVG(retention_rate) FILTER (WHERE cohort_index = 0) AS avg_week0,
+            MIN(retention_rate) FILTER (WHERE cohort_index = 0) AS min_week0,
+            MAX(retention_rate) FILTER (WHERE cohort_index = 0) AS max_week0
+        FROM cohort_retention_rates
+    """).fetchone()
+
     if invalid_count > 0:
         print(f"  [WARNING] Found {invalid_count} rows with retention_rate > 100%!")
     else:
         print("  [OK] All retention rates are valid (0-100%)")
-    
-    # Show week 0 retention (conversion rate)
-    week0_stats = conn.execute("""
-        SELECT 
-            AVG(retention_rate) AS avg_week0,
-            MIN(retention_rate) AS min_week0,
-            MAX(retention_rate) AS max_week0
-        FROM cohort_retention_rates 
-        WHERE cohort_index = 0
-    """).fetchone()
-    
-    print(f"  Week 0 retention (conversion): avg={week0_stats[0]:.2%}, "
-          f"min={week0_stats[1]:.2%}, max={week0_stats[2]:.2%}")
+
+    print(f"  Week 0 retention (conversion): avg={avg_week0:.2%}, "
+          f"min={min_week0:.2%}, max={max_week0:.2%}")
     print()
-    
+
     # Summary
     print("=" * 60)
     print("SUMMARY")
     print("=" * 60)
-    print("All analytics tables created successfully:")
-    print("  - user_sessions")
-    print("  - funnel_sessions")
-    print("  - cohort_users")
-    print("  - cohort_activity")
-    print("  - cohort_retention")
-    print("  - cohort_sizes")
-    print("  - cohort_retention_rates")
+    print("All analytics tables ready:")
+    for table in ALL_TABLES:
+        print(f"  - {table}")
     print()
-    
+
     conn.close()
     print("Done!")
 
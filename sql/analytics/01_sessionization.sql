@@ -9,6 +9,8 @@
 -- Output: user_sessions (sessionized events with session_index)
 -- ============================================================================
 
+CREATE OR REPLACE TABLE user_sessions AS
+
 -- Step 1: Prepare events with fallback session_id for missing values
 -- Missing session_ids are replaced with: user_id || '_' || hour(ts)
 WITH events_prepared AS (
@@ -92,8 +94,7 @@ sessionized AS (
     FROM sessionized_with_index
 )
 
--- Step 6: Create final output table
-CREATE OR REPLACE TABLE user_sessions AS
+-- Step 6: Final output
 SELECT
     user_id,
     session_id,
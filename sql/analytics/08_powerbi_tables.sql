@@ -1,16 +1,16 @@
 -- ============================================================================
--- Power BI Views: Clean, BI-friendly views for dashboarding
+-- Power BI Tables: Clean, BI-ready materialized tables for dashboarding
 -- ============================================================================
--- Purpose: Create optimized views for Power BI dashboards
+-- Purpose: Materialize optimized tables for Power BI dashboards
 --          - Funnel metrics (aggregated)
 --          - Cohort retention rates (from user-based retention tables)
 --          - A/B test summary
 --
 -- Database: DuckDB
 -- Source: funnel_sessions, cohort_retention_rates, cohort_sizes
--- Output: Views (not tables) for Power BI consumption
+-- Output: Materialized tables (v_* names kept for BI compatibility)
 --
--- IMPORTANT: Run AFTER materialize_tables.py to ensure source tables exist
+-- IMPORTANT: Executed by materialize_tables.py AFTER the base tables above
 -- ============================================================================
 
 -- ============================================================================
@@ -25,7 +25,7 @@
 --   - Segmentation by device, source, etc.
 -- ============================================================================
 
-CREATE OR REPLACE VIEW v_funnel_metrics AS
+CREATE OR REPLACE TABLE v_funnel_metrics AS
 SELECT
     -- Dimensions (for filtering/grouping in Power BI)
     COALESCE(source, 'unknown') AS source,
@@ -97,7 +97,7 @@ ORDER BY
 --   - Cohort size analysis
 -- ============================================================================
 
-CREATE OR REPLACE VIEW v_cohort_retention AS
+CREATE OR REPLACE TABLE v_cohort_retention AS
 SELECT
     -- Cohort identification
     cohort_week,
@@ -126,7 +126,7 @@ ORDER BY
 --   - Sample size validation
 -- ============================================================================
 
-CREATE OR REPLACE VIEW v_ab_test_summary AS
+CREATE OR REPLACE TABLE v_ab_test_summary AS
 SELECT
     -- Test identification
     COALESCE(ab_test_id, 'unknown') AS ab_test_id,
@@ -182,7 +182,7 @@ ORDER BY
 --   - Time-series analysis of A/B test performance
 -- ============================================================================
 
-CREATE OR REPLACE VIEW v_ab_test_detailed AS
+CREATE OR REPLACE TABLE v_ab_test_detailed AS
 SELECT
     -- Session identifiers
     user_id,
@@ -220,7 +220,7 @@ ORDER BY
     session_index;
 
 -- ============================================================================
--- Validation Queries (for testing views)
+-- Validation Queries (for testing tables)
 -- ============================================================================
 
 -- Test funnel metrics view
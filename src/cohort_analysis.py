@@ -10,7 +10,9 @@ Usage:
 
 import os
 import duckdb
+import numpy as np
 import pandas as pd
+import pyarrow.feather as feather
 from pathlib import Path
 
 
@@ -18,63 +20,80 @@ from pathlib import Path
 PROJECT_ROOT = Path(__file__).parent.parent
 DB_PATH = PROJECT_ROOT / "analytics.duckdb"
 
-# SQL query file path
-RETENTION_QUERY_FILE = PROJECT_ROOT / "sql" / "analytics" / "05_cohort_retention_rates.sql"
+# Cache for the pivoted retention matrix, keyed by a content hash of
+# cohort_retention_rates so a stale cache is never served
+CACHE_DIR = PROJECT_ROOT / "data" / "cache"
+
+# Pivot query shared by the DataFrame and ndarray matrix builders
+RETENTION_PIVOT_SQL = """
+    PIVOT cohort_retention_rates
+    ON cohort_index
+    USING first(retention_rate)
+    GROUP BY cohort_week
+    ORDER BY cohort_week
+"""
 
 
-def load_retention_query() -> str:
-    """
-    Load the cohort retention rates SQL query from file.
-    
-    Returns:
-        SQL query string
+def load_retention_data(conn: duckdb.DuckDBPyConnection, limit: int = None) -> pd.DataFrame:
     """
-    if not RETENTION_QUERY_FILE.exists():
-        raise FileNotFoundError(f"Retention query file not found: {RETENTION_QUERY_FILE}")
-    
-    with open(RETENTION_QUERY_FILE, 'r') as f:
-        query = f.read()
-    
-    # DuckDB handles SQL comments, but we'll extract just the SELECT statement
-    # Find the main SELECT query (after all CTEs and comments)
-    # For simplicity, we'll use the query as-is since DuckDB handles comments
-    
-    return query
-
-
-def load_retention_data(conn: duckdb.DuckDBPyConnection) -> pd.DataFrame:
-    """
-    Execute the cohort retention rates query and load into DataFrame.
-    
+    Load the cohort retention rates table into a DataFrame.
+
     Args:
         conn: DuckDB connection
-        
+        limit: Optional row cap — previews should pass a small limit so
+            the whole table is never materialized just to print a head
+
     Returns:
-        DataFrame with columns: cohort_week, cohort_index, users_active, 
+        DataFrame with columns: cohort_week, cohort_index, users_active,
         cohort_size, retention_rate
     """
     print("Loading cohort retention data from DuckDB...")
-    
-    # Load and execute the query
-    query = load_retention_query()
+
+    # cohort_week is cast in SQL so no pandas to_datetime pass is needed
+    query = """
+        SELECT
+            cohort_week::TIMESTAMP AS cohort_week,
+            cohort_index,
+            users_active,
+            cohort_size,
+            retention_rate
+        FROM cohort_retention_rates
+        ORDER BY cohort_week, cohort_index
+    """
+    if limit is not None:
+        query += f" LIMIT {limit}"
+
     df = conn.execute(query).df()
-    
-    # Convert cohort_week to datetime if it's not already
-    if 'cohort_week' in df.columns:
-        df['cohort_week'] = pd.to_datetime(df['cohort_week'])
-    
+
     print(f"  Loaded {len(df):,} retention records")
-    
+
     return df
 
 
-def create_retention_matrix(df: pd.DataFrame) -> pd.DataFrame:
+def retention_source_hash(conn: duckdb.DuckDBPyConnection) -> int:
+    """Content hash of cohort_retention_rates, used as the cache key."""
+    return conn.execute("""
+        SELECT hash(string_agg(
+            cohort_week || '|' || cohort_index || '|' || retention_rate,
+            '' ORDER BY cohort_week, cohort_index
+        ))
+        FROM cohort_retention_rates
+    """).fetchone()[0]
+
+
+def create_retention_matrix(conn: duckdb.DuckDBPyConnection) -> pd.DataFrame:
     """
-    Pivot retention data into a matrix format.
-    
+    Pivot retention data into a matrix format using DuckDB's PIVOT.
+
+    The pivot runs inside DuckDB's columnar engine instead of pandas
+    pivot_table, which builds a Python hash index and dispatches per cell.
+    The pivoted matrix is cached as a Feather file keyed by a content
+    hash of the source table, so unchanged inputs skip the pivot and
+    load via a memory-mapped read instead.
+
     Args:
-        df: DataFrame with cohort_week, cohort_index, retention_rate
-        
+        conn: DuckDB connection
+
     Returns:
         Pivoted DataFrame with:
         - index = cohort_week (rows)
@@ -82,24 +101,95 @@ def create_retention_matrix(df: pd.DataFrame) -> pd.DataFrame:
         - values = retention_rate
     """
     print("\nCreating retention matrix...")
-    
-    # Pivot the data: cohort_week x cohort_index
+
+    source_hash = retention_source_hash(conn)
+    cache_path = CACHE_DIR / f"retention_matrix_{source_hash:016x}.feather"
+
+    if cache_path.exists():
+        print(f"  Cache hit: {cache_path.name}")
+        retention_matrix = feather.read_feather(cache_path, memory_map=True)
+        retention_matrix = retention_matrix.set_index('cohort_week')
+        retention_matrix.columns = retention_matrix.columns.astype(int)
+
+        print(f"  Matrix shape: {retention_matrix.shape[0]} cohorts × {retention_matrix.shape[1]} periods")
+        return retention_matrix
+
+    retention_matrix = conn.execute(RETENTION_PIVOT_SQL).df()
+
+    retention_matrix = retention_matrix.set_index('cohort_week')
+
+    # PIVOT emits the cohort_index values as string column names
+    retention_matrix.columns = retention_matrix.columns.astype(int)
+    retention_matrix = retention_matrix.sort_index(axis=1)
+
+    # Refresh the cache (drop matrices built from older table contents)
+    CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    for stale in CACHE_DIR.glob("retention_matrix_*.feather"):
+        stale.unlink()
+    cacheable = retention_matrix.copy()
+    cacheable.columns = cacheable.columns.astype(str)
+    feather.write_feather(cacheable.reset_index(), cache_path)
+    print(f"  Cached matrix: {cache_path.name}")
+
+    print(f"  Matrix shape: {retention_matrix.shape[0]} cohorts × {retention_matrix.shape[1]} periods")
+
+    return retention_matrix
+
+
+def retention_matrix_arrays(conn: duckdb.DuckDBPyConnection):
+    """
+    Build the retention matrix as a dense float32 ndarray, skipping pandas.
+
+    Heatmap/curve plotting only needs a contiguous numeric buffer plus
+    axis labels, so this path fetches the pivot as an Arrow table and
+    stacks the period columns into a float32 matrix — no BlockManager,
+    half the memory of the float64 DataFrame.
+
+    Args:
+        conn: DuckDB connection
+
+    Returns:
+        Tuple of (cohort_weeks, cohort_indexes, matrix):
+        - cohort_weeks: datetime64 array, one entry per matrix row
+        - cohort_indexes: int64 array, one entry per matrix column
+        - matrix: float32 ndarray of retention rates (NaN = no activity)
+    """
+    table = conn.execute(RETENTION_PIVOT_SQL).to_arrow_table()
+
+    cohort_weeks = table.column('cohort_week').to_numpy()
+
+    # PIVOT emits the cohort_index values as string column names
+    period_names = table.column_names[1:]
+    cohort_indexes = np.array([int(name) for name in period_names])
+    order = np.argsort(cohort_indexes)
+
+    matrix = np.column_stack([
+        table.column(period_names[i]).to_numpy(zero_copy_only=False)
+        for i in order
+    ]).astype(np.float32)
+
+    return cohort_weeks, cohort_indexes[order], matrix
+
+
+def create_retention_matrix_pandas(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Pandas fallback for the retention pivot (kept for environments where
+    the DuckDB PIVOT path is unavailable).
+
+    Args:
+        df: DataFrame with cohort_week, cohort_index, retention_rate
+
+    Returns:
+        Pivoted DataFrame (same shape as create_retention_matrix)
+    """
     retention_matrix = df.pivot_table(
         index='cohort_week',
         columns='cohort_index',
         values='retention_rate',
         fill_value=None  # Keep NaN for missing periods
     )
-    
-    # Sort cohorts chronologically
-    retention_matrix = retention_matrix.sort_index()
-    
-    # Sort columns (cohort_index) numerically
-    retention_matrix = retention_matrix.sort_index(axis=1)
-    
-    print(f"  Matrix shape: {retention_matrix.shape[0]} cohorts × {retention_matrix.shape[1]} periods")
-    
-    return retention_matrix
+
+    return retention_matrix.sort_index().sort_index(axis=1)
 
 
 def main():
@@ -109,46 +199,50 @@ def main():
     print("="*60)
     print(f"Database: {DB_PATH}")
     print("="*60)
-    
+
     # Verify database exists
     if not DB_PATH.exists():
         raise FileNotFoundError(f"Database not found: {DB_PATH}")
-    
-    # Connect to DuckDB
-    conn = duckdb.connect(str(DB_PATH))
-    
+
+    # Connect to DuckDB read-only: this is a pure read workload, so skip
+    # the write lock and let concurrent analysis processes share the file
+    conn = duckdb.connect(str(DB_PATH), read_only=True)
+
     try:
-        # Load retention data
-        retention_df = load_retention_data(conn)
-        
+        # Preview of the raw data — bounded in SQL so the full table is
+        # never pulled into pandas just for a 10-row print
+        preview_df = load_retention_data(conn, limit=10)
+
         # Display head of raw data
         print("\n" + "="*60)
         print("RAW RETENTION DATA (First 10 rows)")
         print("="*60)
-        print(retention_df.head(10).to_string())
-        
-        # Create retention matrix
-        retention_matrix = create_retention_matrix(retention_df)
-        
+        print(preview_df.to_string())
+
+        # Create retention matrix (cached DataFrame for notebook consumers)
+        retention_matrix = create_retention_matrix(conn)
+
+        # Dense float32 matrix + label arrays for plotting
+        cohort_weeks, cohort_indexes, matrix = retention_matrix_arrays(conn)
+
         # Display matrix info
         print("\n" + "="*60)
         print("RETENTION MATRIX INFO")
         print("="*60)
-        print(f"Shape: {retention_matrix.shape[0]} cohorts × {retention_matrix.shape[1]} periods")
+        print(f"Shape: {matrix.shape[0]} cohorts × {matrix.shape[1]} periods")
         print(f"\nFirst 5 cohorts (first 10 periods):")
         print(retention_matrix.iloc[:5, :10].to_string())
-        
+
         print("\n" + "="*60)
         print("Data preparation complete!")
         print("="*60)
         print("\nNext steps:")
         print("  - Retention matrix ready for visualization")
         print("  - Use retention_matrix for heatmaps and retention curves")
-        
+
     finally:
         conn.close()
 
 
 if __name__ == "__main__":
     main()
-
@@ -14,16 +14,20 @@ Output:
 """
 
 import os
-import uuid
+from concurrent.futures import ThreadPoolExecutor
 import pandas as pd
 import numpy as np
-from datetime import datetime, timedelta
-from typing import Tuple, List, Dict
+import pyarrow as pa
+from pyarrow import csv as pacsv
+from datetime import datetime
 
 
 # Configuration
 RANDOM_SEED = 42
-np.random.seed(RANDOM_SEED)
+
+# Single module-wide PCG64 generator: ~2x faster draws than the legacy
+# Mersenne Twister singleton and no global-state mutation
+RNG = np.random.default_rng(RANDOM_SEED)
 
 # Data scale
 N_USERS = 120_000
@@ -67,12 +71,17 @@ PRICE_LOG_STD = 0.8   # lognormal std
 # Product category mapping (deterministic)
 PRODUCT_CATEGORIES = ["electronics", "fashion", "home", "beauty", "sports"]
 
+# Vectorized product_id -> category lookup, indexable by product_id
+# (pid % len(PRODUCT_CATEGORIES)): one array gather instead of a Python
+# call per row
+PRODUCT_CATEGORY_LUT = np.array(PRODUCT_CATEGORIES, dtype=object)[
+    np.arange(N_PRODUCTS + 1) % len(PRODUCT_CATEGORIES)
+]
 
-def get_product_category(product_id) -> str:
-    """Deterministically assign product category based on product_id."""
-    if pd.isna(product_id) or product_id is None:
-        return None
-    return PRODUCT_CATEGORIES[int(product_id) % len(PRODUCT_CATEGORIES)]
+# Funnel stages in order; the list index doubles as the per-event stage code
+FUNNEL_STAGES = ["visit", "product_view", "add_to_cart", "checkout", "purchase"]
+STAGE_PAGES = ["home", "product", "product", "checkout", "checkout"]
+AB_TEST_ID = "checkout_layout_test_1"
 
 
 def generate_users() -> pd.DataFrame:
@@ -88,24 +97,28 @@ def generate_users() -> pd.DataFrame:
     user_ids = np.arange(1, N_USERS + 1)
     
     # Generate signup dates (more recent signups slightly more common)
-    # Using beta distribution to create slight bias toward recent dates
-    signup_days = np.random.beta(2, 3, N_USERS) * DATE_RANGE_DAYS
-    signup_dates = [START_DATE + timedelta(days=int(d)) for d in signup_days]
+    # Using beta distribution to create slight bias toward recent dates.
+    # Built as a single datetime64 expression: one pass over an int buffer
+    # instead of 120k datetime objects from a list comprehension
+    signup_days = RNG.beta(2, 3, N_USERS) * DATE_RANGE_DAYS
+    signup_dates = (
+        np.datetime64(START_DATE, "D") + signup_days.astype(np.int32).astype("timedelta64[D]")
+    ).astype("datetime64[s]")
     
     # Generate devices with specified distribution
-    devices = np.random.choice(DEVICE_DIST, size=N_USERS, p=DEVICE_PROBS)
+    devices = np.array(DEVICE_DIST, dtype=object)[draw_categorical(DEVICE_PROBS, N_USERS)]
     
     # Generate countries with specified distribution
-    countries = np.random.choice(COUNTRIES, size=N_USERS, p=COUNTRY_PROBS)
+    countries = np.array(COUNTRIES, dtype=object)[draw_categorical(COUNTRY_PROBS, N_USERS)]
     
     # Identify bot users (2% of users)
-    is_bot = np.random.random(N_USERS) < BOT_USER_PCT
+    is_bot = RNG.random(N_USERS) < BOT_USER_PCT
     
     users_df = pd.DataFrame({
         "user_id": user_ids,
         "signup_date": signup_dates,
-        "device": devices,
-        "country": countries,
+        "device": pd.Categorical(devices, categories=DEVICE_DIST),
+        "country": pd.Categorical(countries, categories=COUNTRIES),
         "is_bot": is_bot  # Internal flag, will be removed before saving
     })
 
@@ -115,25 +128,23 @@ def generate_users() -> pd.DataFrame:
     # - silver  ~25%
     # - gold    ~12%
     # - platinum ~3%
-    users_sorted = users_df.sort_values("signup_date").copy()
-    n = len(users_sorted)
-    n_platinum = int(0.03 * n)
-    n_gold = int(0.12 * n)
-    n_silver = int(0.25 * n)
+    n_platinum = int(0.03 * N_USERS)
+    n_gold = int(0.12 * N_USERS)
+    n_silver = int(0.25 * N_USERS)
     # Remaining users will be bronze
 
-    loyalty_tier = np.full(n, "bronze", dtype=object)
+    # argpartition groups users by signup rank in O(N) — no sort by
+    # signup_date plus re-sort by user_id over the whole frame
+    cuts = [n_platinum, n_platinum + n_gold, n_platinum + n_gold + n_silver]
+    ranked = np.argpartition(signup_days, cuts)
+
+    loyalty_tier = np.full(N_USERS, "bronze", dtype=object)
     # Earliest signups get higher tiers
-    loyalty_tier[: n_platinum] = "platinum"
-    loyalty_tier[n_platinum : n_platinum + n_gold] = "gold"
-    loyalty_tier[n_platinum + n_gold : n_platinum + n_gold + n_silver] = "silver"
-    users_sorted["loyalty_tier"] = loyalty_tier
-
-    # Map back to original order
-    users_df = (
-        users_sorted[["user_id", "signup_date", "device", "country", "is_bot", "loyalty_tier"]]
-        .sort_values("user_id")
-        .reset_index(drop=True)
+    loyalty_tier[ranked[: cuts[0]]] = "platinum"
+    loyalty_tier[ranked[cuts[0] : cuts[1]]] = "gold"
+    loyalty_tier[ranked[cuts[1] : cuts[2]]] = "silver"
+    users_df["loyalty_tier"] = pd.Categorical(
+        loyalty_tier, categories=["bronze", "silver", "gold", "platinum"]
     )
 
     print(f"  Generated {len(users_df)} users")
@@ -146,167 +157,215 @@ def generate_users() -> pd.DataFrame:
     return users_df
 
 
-def generate_session_id() -> str:
-    """Generate a UUID session ID."""
-    return str(uuid.uuid4())
+def write_csv(df: pd.DataFrame, path: str):
+    """
+    Write a DataFrame to CSV through PyArrow's parallel C++ writer.
+
+    pandas.to_csv formats row-at-a-time in Python; pyarrow formats each
+    column vectorized in C++ directly from the Arrow (SoA) representation,
+    which is several times faster on the ~1M-row events table. Timestamps
+    are kept in the same "YYYY-MM-DD HH:MM:SS" form to_csv produced.
+    """
+    table = pa.Table.from_pandas(df, preserve_index=False)
+
+    # Stream 64k-row record batches through CSVWriter instead of handing
+    # the whole table to write_csv, so only one batch's worth of formatted
+    # text is buffered at a time
+    with pacsv.CSVWriter(path, table.schema) as writer:
+        for batch in table.to_batches(max_chunksize=65536):
+            writer.write_batch(batch)
 
 
-def simulate_session_funnel(
-    session_id: str,
-    user_id: int,
-    user_info: Dict,
-    start_time: datetime,
-) -> List[Dict]:
+def draw_categorical(probs, n: int) -> np.ndarray:
     """
-    Simulate a single session with SESSION-FIRST, FUNNEL-DRIVEN logic.
-    
-    Each session follows strict funnel progression with increasing timestamps.
-    
+    Draw n category indices from a probability vector in one shot.
+
+    Precomputes the CDF and maps uniform draws through one searchsorted,
+    instead of Generator.choice(p=...) which revalidates and rebuilds the
+    CDF on every call.
+    """
+    cdf = np.cumsum(probs)
+    return np.minimum(np.searchsorted(cdf, RNG.random(n), side="right"), len(cdf) - 1)
+
+
+def generate_hex_ids(n: int) -> np.ndarray:
+    """
+    Generate n random 64-bit hex IDs in a single vectorized draw.
+
+    Replaces str(uuid.uuid4()) per row (~2µs each, >4s across ~1M events)
+    with one batched RNG call plus a vectorized hex format. IDs stay
+    unique in practice: the collision odds for ~1M draws from a 63-bit
+    space are ~1e-7.
+    """
+    ids = RNG.integers(1, np.iinfo(np.int64).max, size=n, dtype=np.int64)
+    return np.char.mod("%016x", ids).astype(object)
+
+
+def simulate_funnel_events(
+    session_ids: np.ndarray,
+    session_users: np.ndarray,
+    start_times: np.ndarray,
+    sources: np.ndarray,
+    users_df: pd.DataFrame,
+) -> pd.DataFrame:
+    """
+    Simulate every session's funnel in one vectorized pass.
+
+    Keeps the SESSION-FIRST, FUNNEL-DRIVEN logic (strict stage progression,
+    increasing timestamps) but draws each stage's outcome for all sessions
+    at once with boolean masks instead of running a Python branch tree per
+    session. Stage rows are generated as flat arrays and ordered by
+    (session, stage, rank), so the output matches the old per-session
+    event order.
+
     Args:
-        session_id: Session UUID
-        user_id: User ID
-        user_info: Dictionary with user attributes (device, country, is_bot, source, loyalty_tier, ab_variant)
-        start_time: Session start timestamp
-        
+        session_ids: Session ID per session
+        session_users: User ID per session
+        start_times: Session start timestamp per session (datetime64)
+        sources: Traffic source per session
+        users_df: Users dataframe (for device / is_bot / loyalty_tier)
+
     Returns:
-        List of event dictionaries in funnel order
+        DataFrame with event columns, one row per event
     """
-    events = []
-    current_time = start_time
-    is_bot = user_info.get("is_bot", False)
-    device = user_info.get("device", "desktop")
-    source = user_info.get("source", "organic")
-    loyalty_tier = user_info.get("loyalty_tier", "bronze")
-    ab_variant = user_info.get("ab_variant", "control")
-    
-    # Stage 1: Visit (ALWAYS exactly once)
-    events.append({
-        "event_id": str(uuid.uuid4()),
-        "user_id": user_id,
-        "session_id": session_id,
-        "event_type": "visit",
-        "page": "home",
-        "product_id": None,
-        "product_category": None,
-        "ts": current_time,
-        "source": source,
-        "device": device,
-        "ab_test_id": None,
-        "variant": None
+    n_sessions = len(session_ids)
+
+    # Per-session user attributes via positional gather (user_ids are 1..N)
+    user_pos = session_users - 1
+    devices = users_df["device"].to_numpy()[user_pos]
+    is_bot = users_df["is_bot"].to_numpy()[user_pos]
+    loyalty = users_df["loyalty_tier"].to_numpy()[user_pos]
+
+    # A/B test variant is deterministic at the user level
+    variants = np.where(session_users % 2 == 0, "variant", "control")
+
+    # Stage 2: Product View (Probability: 0.75-0.85), 1-4 views per session
+    view_prob = RNG.uniform(0.75, 0.85, n_sessions)
+    has_view = RNG.random(n_sessions) < view_prob
+    n_views = np.where(
+        has_view, np.minimum(RNG.poisson(2.5, n_sessions) + 1, 4), 0
+    )
+
+    # Stage 3: Add to Cart (CONDITIONAL on product_view, Probability: 0.30-0.40,
+    # higher for gold/platinum). Bots never proceed past product_view.
+    cart_prob = RNG.uniform(0.30, 0.40, n_sessions)
+    high_tier = (loyalty == "gold") | (loyalty == "platinum")
+    cart_prob = np.where(high_tier, np.minimum(0.40, cart_prob * 1.15), cart_prob)
+    has_cart = has_view & ~is_bot & (RNG.random(n_sessions) < cart_prob)
+    n_cart = np.where(
+        has_cart, np.minimum(RNG.poisson(1.5, n_sessions) + 1, n_views), 0
+    )
+
+    # Stage 4: Checkout (CONDITIONAL on add_to_cart, Probability: 0.45-0.55,
+    # slightly lower on mobile)
+    checkout_prob = RNG.uniform(0.45, 0.55, n_sessions)
+    checkout_prob = np.where(devices == "mobile", checkout_prob * 0.95, checkout_prob)
+    has_checkout = has_cart & (RNG.random(n_sessions) < checkout_prob)
+
+    # Stage 5: Purchase (CONDITIONAL on checkout; control ~0.85, variant ~0.92)
+    purchase_prob = np.where(variants == "control", 0.85, 0.92)
+    has_purchase = has_checkout & (RNG.random(n_sessions) < purchase_prob)
+
+    # Cumulative dwell time before each stage (seconds after session start)
+    t_view = RNG.exponential(30, n_sessions)
+    t_cart = t_view + RNG.exponential(60, n_sessions)
+    t_checkout = t_cart + RNG.exponential(45, n_sessions)
+    t_purchase = t_checkout + RNG.exponential(120, n_sessions)
+
+    # Product-view rows
+    total_views = int(n_views.sum())
+    view_session = np.repeat(np.arange(n_sessions), n_views)
+    view_offsets = np.concatenate(([0], np.cumsum(n_views)[:-1]))
+    view_rank = np.arange(total_views) - np.repeat(view_offsets, n_views)
+    view_pid = RNG.integers(1, N_PRODUCTS + 1, total_views)
+    view_ts = t_view[view_session] + view_rank * 10 + RNG.exponential(15, total_views)
+
+    # Add-to-cart rows: each cart item picks one of the session's viewed products
+    total_cart = int(n_cart.sum())
+    cart_session = np.repeat(np.arange(n_sessions), n_cart)
+    cart_offsets = np.concatenate(([0], np.cumsum(n_cart)[:-1]))
+    cart_rank = np.arange(total_cart) - np.repeat(cart_offsets, n_cart)
+    picked_view = RNG.integers(0, np.maximum(n_views[cart_session], 1))
+    cart_pid = view_pid[view_offsets[cart_session] + picked_view]
+    cart_ts = t_cart[cart_session] + cart_rank * 5 + RNG.exponential(10, total_cart)
+
+    # Checkout / purchase rows (purchase takes the first cart item)
+    checkout_session = np.flatnonzero(has_checkout)
+    purchase_session = np.flatnonzero(has_purchase)
+    purchase_pid = cart_pid[cart_offsets[purchase_session]]
+
+    # Assemble all stages, then order by (session, funnel stage, rank) to
+    # recover the per-session funnel order
+    session_idx = np.concatenate([
+        np.arange(n_sessions), view_session, cart_session,
+        checkout_session, purchase_session,
+    ])
+    stage = np.concatenate([
+        np.full(n_sessions, 0, np.int8),
+        np.full(total_views, 1, np.int8),
+        np.full(total_cart, 2, np.int8),
+        np.full(len(checkout_session), 3, np.int8),
+        np.full(len(purchase_session), 4, np.int8),
+    ])
+    rank = np.concatenate([
+        np.zeros(n_sessions, np.int64), view_rank, cart_rank,
+        np.zeros(len(checkout_session), np.int64),
+        np.zeros(len(purchase_session), np.int64),
+    ])
+    ts_offset = np.concatenate([
+        np.zeros(n_sessions), view_ts, cart_ts,
+        t_checkout[checkout_session], t_purchase[purchase_session],
+    ])
+    pids = np.concatenate([
+        np.zeros(n_sessions, np.int64), view_pid, cart_pid,
+        np.zeros(len(checkout_session), np.int64), purchase_pid,
+    ])
+
+    order = np.lexsort((rank, stage, session_idx))
+    session_idx = session_idx[order]
+    stage = stage[order]
+    pids = pids[order]
+    ts = start_times[session_idx] + ts_offset[order].astype("timedelta64[s]")
+
+    n_events = len(session_idx)
+
+    # Stage code -> event_type / page via array gather
+    event_types = np.array(FUNNEL_STAGES, dtype=object)[stage]
+    pages = np.array(STAGE_PAGES, dtype=object)[stage]
+
+    # product_id stays an object column (ints + None) like the old output
+    product_ids = pids.astype(object)
+    product_ids[pids == 0] = None
+
+    # Category as int8 codes straight from the product id (the category
+    # order matches pid % len(PRODUCT_CATEGORIES)); -1 marks "no product"
+    # and becomes NaN in the categorical — no string array is ever built
+    cat_codes = np.where(pids > 0, pids % len(PRODUCT_CATEGORIES), -1).astype(np.int8)
+
+    in_ab_test = stage >= 3  # checkout and purchase carry the A/B test fields
+
+    # Low-cardinality columns are stored as categoricals: int8 codes plus a
+    # small dictionary instead of a PyObject string per row, which cuts the
+    # frame's memory by >10x and speeds every downstream mask/value_counts
+    return pd.DataFrame({
+        "event_id": generate_hex_ids(n_events),
+        "user_id": session_users[session_idx],
+        "session_id": session_ids[session_idx],
+        "event_type": pd.Categorical(event_types, categories=FUNNEL_STAGES),
+        "page": pd.Categorical(pages, categories=["home", "product", "checkout"]),
+        "product_id": product_ids,
+        "product_category": pd.Categorical.from_codes(cat_codes, PRODUCT_CATEGORIES),
+        "ts": ts,
+        "source": pd.Categorical(sources[session_idx], categories=SOURCES),
+        "device": pd.Categorical(devices[session_idx], categories=DEVICE_DIST),
+        "ab_test_id": pd.Categorical(
+            np.where(in_ab_test, AB_TEST_ID, None), categories=[AB_TEST_ID]
+        ),
+        "variant": pd.Categorical(
+            np.where(in_ab_test, variants[session_idx], None),
+            categories=["control", "variant"],
+        ),
     })
-    current_time += timedelta(seconds=np.random.exponential(30))
-    
-    # Stage 2: Product View (Probability: 0.75-0.85)
-    product_view_prob = np.random.uniform(0.75, 0.85)
-    viewed_products = []
-    
-    if np.random.random() < product_view_prob:
-        # 1-4 product views per session
-        n_views = np.random.poisson(2.5) + 1
-        n_views = min(n_views, 4)  # Cap at 4
-        
-        for i in range(n_views):
-            product_id = np.random.randint(1, N_PRODUCTS + 1)
-            viewed_products.append(product_id)
-            events.append({
-                "event_id": str(uuid.uuid4()),
-                "user_id": user_id,
-                "session_id": session_id,
-                "event_type": "product_view",
-                "page": "product",
-                "product_id": product_id,
-                "product_category": get_product_category(product_id),
-                "ts": current_time + timedelta(seconds=i*10 + np.random.exponential(15)),
-                "source": source,
-                "device": device,
-                "ab_test_id": None,
-                "variant": None
-            })
-        current_time += timedelta(seconds=np.random.exponential(60))
-    
-    # Bots never proceed past product_view
-    if is_bot:
-        return events
-    
-    # Stage 3: Add to Cart (CONDITIONAL on product_view, Probability: 0.30-0.40)
-    if viewed_products:
-        add_to_cart_prob = np.random.uniform(0.30, 0.40)
-        
-        # Higher for gold/platinum users
-        if loyalty_tier in ["gold", "platinum"]:
-            add_to_cart_prob = min(0.40, add_to_cart_prob * 1.15)
-        
-        if np.random.random() < add_to_cart_prob:
-            # Add 1-3 products to cart
-            n_cart_items = min(np.random.poisson(1.5) + 1, len(viewed_products))
-            cart_products = []
-            
-            for i in range(n_cart_items):
-                product_id = np.random.choice(viewed_products)
-                cart_products.append(product_id)
-                events.append({
-                    "event_id": str(uuid.uuid4()),
-                    "user_id": user_id,
-                    "session_id": session_id,
-                    "event_type": "add_to_cart",
-                    "page": "product",
-                    "product_id": product_id,
-                    "product_category": get_product_category(product_id),
-                    "ts": current_time + timedelta(seconds=i*5 + np.random.exponential(10)),
-                    "source": source,
-                    "device": device,
-                    "ab_test_id": None,
-                    "variant": None
-                })
-            current_time += timedelta(seconds=np.random.exponential(45))
-            
-            # Stage 4: Checkout (CONDITIONAL on add_to_cart, Probability: 0.45-0.55)
-            checkout_prob = np.random.uniform(0.45, 0.55)
-            
-            # Slightly lower for mobile
-            if device == "mobile":
-                checkout_prob *= 0.95  # 5% reduction
-            
-            if np.random.random() < checkout_prob:
-                events.append({
-                    "event_id": str(uuid.uuid4()),
-                    "user_id": user_id,
-                    "session_id": session_id,
-                    "event_type": "checkout",
-                    "page": "checkout",
-                    "product_id": None,
-                    "product_category": None,
-                    "ts": current_time,
-                    "source": source,
-                    "device": device,
-                    "ab_test_id": "checkout_layout_test_1",
-                    "variant": ab_variant
-                })
-                current_time += timedelta(seconds=np.random.exponential(120))
-                
-                # Stage 5: Purchase (CONDITIONAL on checkout)
-                # Control: ~0.85, Variant: ~0.92
-                purchase_prob = 0.85 if ab_variant == "control" else 0.92
-                
-                if np.random.random() < purchase_prob:
-                    # Purchase primary product from cart
-                    product_id = cart_products[0]
-                    events.append({
-                        "event_id": str(uuid.uuid4()),
-                        "user_id": user_id,
-                        "session_id": session_id,
-                        "event_type": "purchase",
-                        "page": "checkout",
-                        "product_id": product_id,
-                        "product_category": get_product_category(product_id),
-                        "ts": current_time,
-                        "source": source,
-                        "device": device,
-                        "ab_test_id": "checkout_layout_test_1",
-                        "variant": ab_variant
-                    })
-    
-    return events
 
 
 def generate_events(users_df: pd.DataFrame) -> pd.DataFrame:
@@ -324,100 +383,82 @@ def generate_events(users_df: pd.DataFrame) -> pd.DataFrame:
     """
     print("\nGenerating events (SESSION-FIRST approach)...")
     
-    user_info_dict = users_df.set_index("user_id").to_dict("index")
-    
-    # Step 1: Generate sessions first
+    # Per-user attribute arrays (SoA): positional access into contiguous
+    # columns instead of 120k per-user dicts from to_dict("index")
+    is_bot_arr = users_df["is_bot"].to_numpy()
+    loyalty_arr = users_df["loyalty_tier"].to_numpy()
+    signup_arr = users_df["signup_date"].to_numpy()
+
+    # Step 1: Generate sessions first (all users in one vectorized pass)
     print(f"  Step 1: Generating ~{N_SESSIONS_TARGET:,} sessions...")
-    sessions = []
-    
-    # Assign A/B test variant deterministically at user level
-    for user_id in users_df["user_id"]:
-        user_info = user_info_dict[user_id]
-        user_info["ab_variant"] = "variant" if (int(user_id) % 2 == 0) else "control"
-    
-    # Generate sessions for each user
-    for user_id in users_df["user_id"]:
-        user_info = user_info_dict[user_id]
-        is_bot = user_info["is_bot"]
-        loyalty_tier = user_info.get("loyalty_tier", "bronze")
-        
-        # Determine number of sessions per user
-        if is_bot:
-            # Bots have many sessions
-            n_sessions = np.random.poisson(15) + 10
-        else:
-            # Regular users: session count influenced by loyalty tier
-            if loyalty_tier == "platinum":
-                lambda_sessions = 4.5
-            elif loyalty_tier == "gold":
-                lambda_sessions = 3.5
-            elif loyalty_tier == "silver":
-                lambda_sessions = 2.5
-            else:  # bronze
-                lambda_sessions = 1.8
-            n_sessions = np.random.poisson(lambda_sessions) + 1
-        
-        # Generate sessions for this user
-        signup_date = user_info["signup_date"]
-        for _ in range(n_sessions):
-            # Session start time (after signup, weighted toward recent)
-            days_since_signup = np.random.exponential(30)
-            session_start = signup_date + timedelta(days=int(days_since_signup))
-            session_start = min(session_start, END_DATE)
-            
-            # Assign traffic source
-            if np.random.random() < SOURCE_PROBS[1]:  # paid
-                source = "paid"
-            else:
-                remaining_probs = [SOURCE_PROBS[0], SOURCE_PROBS[2], SOURCE_PROBS[3]]
-                remaining_probs = np.array(remaining_probs) / sum(remaining_probs)
-                remaining_sources = ["organic", "email", "referral"]
-                source = np.random.choice(remaining_sources, p=remaining_probs)
-            
-            sessions.append({
-                "session_id": generate_session_id(),
-                "user_id": user_id,
-                "start_time": session_start,
-                "source": source
-            })
-    
-    # Trim to target if needed (convert to list first for random choice)
-    if len(sessions) > N_SESSIONS_TARGET * 1.1:
-        indices = np.random.choice(len(sessions), size=int(N_SESSIONS_TARGET * 1.05), replace=False)
-        sessions = [sessions[i] for i in indices]
-    
-    print(f"  Generated {len(sessions):,} sessions")
-    
-    # Step 2: Generate events for each session
+
+    # Sessions per user: bots have many; regular users scale with loyalty tier
+    lambda_by_tier = np.select(
+        [loyalty_arr == "platinum", loyalty_arr == "gold", loyalty_arr == "silver"],
+        [4.5, 3.5, 2.5],
+        default=1.8,
+    )
+    n_sessions_per_user = np.where(
+        is_bot_arr,
+        RNG.poisson(15, len(users_df)) + 10,
+        RNG.poisson(lambda_by_tier) + 1,
+    )
+
+    total_sessions = int(n_sessions_per_user.sum())
+    user_pos_per_session = np.repeat(np.arange(len(users_df)), n_sessions_per_user)
+    session_user_arr = user_pos_per_session + 1  # user_ids are contiguous 1..N
+
+    # Session start time (after signup, weighted toward recent, capped at END_DATE)
+    days_since_signup = RNG.exponential(30, total_sessions).astype(np.int64)
+    start_time_arr = np.minimum(
+        signup_arr[user_pos_per_session] + days_since_signup.astype("timedelta64[D]"),
+        np.datetime64(END_DATE, "s"),
+    )
+
+    # Assign traffic source. The old two-step draw (paid first, then the
+    # remaining sources renormalized) is exactly the SOURCE_PROBS marginal,
+    # so a single choice() call is equivalent
+    source_arr = np.array(SOURCES, dtype=object)[draw_categorical(SOURCE_PROBS, total_sessions)]
+
+    # Trim to target if needed. argpartition on random keys picks a uniform
+    # subset in O(n) (choice with replace=False permutes the full index
+    # range), and sorting the kept int indices preserves the user-grouped
+    # session order so the events table needs no later re-sort
+    if total_sessions > N_SESSIONS_TARGET * 1.1:
+        n_keep = int(N_SESSIONS_TARGET * 1.05)
+        keys = RNG.random(total_sessions)
+        keep = np.sort(np.argpartition(keys, n_keep)[:n_keep])
+        session_user_arr = session_user_arr[keep]
+        start_time_arr = start_time_arr[keep]
+        source_arr = source_arr[keep]
+
+    session_id_arr = generate_hex_ids(len(session_user_arr))
+    print(f"  Generated {len(session_user_arr):,} sessions")
+
+    # Step 2: Generate events for all sessions in one vectorized pass
     print(f"  Step 2: Generating events for each session...")
-    all_events = []
-    
-    for session in sessions:
-        user_id = session["user_id"]
-        user_info = user_info_dict[user_id].copy()
-        user_info["source"] = session["source"]
-        
-        session_events = simulate_session_funnel(
-            session_id=session["session_id"],
-            user_id=user_id,
-            user_info=user_info,
-            start_time=session["start_time"]
-        )
-        all_events.extend(session_events)
-    
-    # Convert to DataFrame
-    events_df = pd.DataFrame(all_events)
+
+    events_df = simulate_funnel_events(
+        session_id_arr, session_user_arr, start_time_arr, source_arr, users_df
+    )
     
+    # Noise is applied straight on the session_id array — plain boolean and
+    # fancy indexing instead of label-based .loc assignment
+    session_col = events_df["session_id"].to_numpy()
+
     # Add noise: missing session_ids (~3%)
-    missing_mask = np.random.random(len(events_df)) < MISSING_SESSION_PCT
-    events_df.loc[missing_mask, "session_id"] = None
-    
-    # Add noise: duplicate session_ids (~1%)
-    duplicate_mask = np.random.random(len(events_df)) < DUPLICATE_SESSION_PCT
-    if duplicate_mask.sum() > 0:
-        duplicate_indices = events_df[duplicate_mask].index
-        source_indices = np.random.choice(events_df[~duplicate_mask].index, size=len(duplicate_indices))
-        events_df.loc[duplicate_indices, "session_id"] = events_df.loc[source_indices, "session_id"].values
+    missing_mask = RNG.random(len(session_col)) < MISSING_SESSION_PCT
+    session_col[missing_mask] = None
+
+    # Add noise: duplicate session_ids (~1%): copy the id of a random
+    # other event
+    duplicate_mask = RNG.random(len(session_col)) < DUPLICATE_SESSION_PCT
+    n_duplicates = int(duplicate_mask.sum())
+    if n_duplicates > 0:
+        source_idx = RNG.choice(np.flatnonzero(~duplicate_mask), size=n_duplicates)
+        session_col[duplicate_mask] = session_col[source_idx]
+
+    events_df["session_id"] = session_col
     
     print(f"  Generated {len(events_df):,} events")
     
@@ -438,54 +479,55 @@ def generate_orders(events_df: pd.DataFrame, users_df: pd.DataFrame) -> pd.DataF
     print("\nGenerating orders...")
     
     # Get purchase events
-    purchase_events = events_df[events_df["event_type"] == "purchase"].copy()
-    
+    purchase_events = events_df[events_df["event_type"] == "purchase"]
+
     if len(purchase_events) == 0:
         print("  Warning: No purchase events found!")
         return pd.DataFrame(columns=["order_id", "user_id", "product_id", "price", "quantity", "discount_amount", "ts", "payment_status"])
-    
+
     print(f"  Found {len(purchase_events):,} purchase events")
-    
-    # Generate orders
-    orders = []
-    for _, event in purchase_events.iterrows():
-        # Generate order ID
-        order_id = str(uuid.uuid4())
-        
-        # Generate price (lognormal distribution)
-        log_price = np.random.normal(PRICE_LOG_MEAN, PRICE_LOG_STD)
-        price = np.exp(log_price)
-        price = np.clip(price, MIN_PRICE, MAX_PRICE)
-        price = round(price, 2)
-        
-        # Quantity (1-4, skewed toward 1)
-        quantity = np.random.choice([1, 2, 3, 4], p=[0.70, 0.20, 0.07, 0.03])
-        
-        # Discount amount (mostly 0, higher for paid traffic and variant users)
-        discount_amount = 0.0
-        if event["source"] == "paid" or event.get("variant") == "variant":
-            if np.random.random() < 0.15:  # 15% chance of discount
-                discount_amount = round(price * np.random.uniform(0.05, 0.20), 2)
-        
-        # Ensure price - discount >= MIN_PRICE
-        if price - discount_amount < MIN_PRICE:
-            discount_amount = max(0, price - MIN_PRICE)
-        
-        # Payment status (8% failure rate)
-        payment_status = "failed" if np.random.random() < 0.08 else "success"
-        
-        orders.append({
-            "order_id": order_id,
-            "user_id": event["user_id"],
-            "product_id": event["product_id"],
-            "price": price,
-            "quantity": quantity,
-            "discount_amount": discount_amount,
-            "ts": event["ts"],
-            "payment_status": payment_status
-        })
-    
-    orders_df = pd.DataFrame(orders)
+
+    n_orders = len(purchase_events)
+
+    # Generate prices (lognormal distribution)
+    prices = np.exp(RNG.normal(PRICE_LOG_MEAN, PRICE_LOG_STD, n_orders))
+    prices = np.clip(prices, MIN_PRICE, MAX_PRICE).round(2)
+
+    # Quantity (1-4, skewed toward 1)
+    quantity = 1 + draw_categorical([0.70, 0.20, 0.07, 0.03], n_orders)
+
+    # Discount amount (mostly 0, higher for paid traffic and variant users)
+    eligible = (
+        (purchase_events["source"].to_numpy() == "paid")
+        | (purchase_events["variant"].to_numpy() == "variant")
+    )
+    has_discount = eligible & (RNG.random(n_orders) < 0.15)  # 15% chance
+    discount_amount = np.where(
+        has_discount,
+        np.round(prices * RNG.uniform(0.05, 0.20, n_orders), 2),
+        0.0,
+    )
+
+    # Ensure price - discount >= MIN_PRICE
+    discount_amount = np.where(
+        prices - discount_amount < MIN_PRICE,
+        np.maximum(0.0, prices - MIN_PRICE),
+        discount_amount,
+    )
+
+    # Payment status (8% failure rate)
+    payment_status = np.where(RNG.random(n_orders) < 0.08, "failed", "success")
+
+    orders_df = pd.DataFrame({
+        "order_id": generate_hex_ids(n_orders),
+        "user_id": purchase_events["user_id"].to_numpy(),
+        "product_id": purchase_events["product_id"].to_numpy(),
+        "price": prices,
+        "quantity": quantity,
+        "discount_amount": discount_amount,
+        "ts": purchase_events["ts"].to_numpy(),
+        "payment_status": pd.Categorical(payment_status, categories=["success", "failed"]),
+    })
     
     print(f"  Generated {len(orders_df):,} orders")
     print(f"  Successful payments: {(orders_df['payment_status'] == 'success').sum():,}")
@@ -519,10 +561,12 @@ def validate_and_print_stats(users_df: pd.DataFrame, events_df: pd.DataFrame, or
     # Calculate conversion rates (session-level)
     print(f"\nFunnel Conversion Rates (Session-level):")
     
-    sessions_with_product_view = events_df[events_df["event_type"] == "product_view"]["session_id"].nunique()
-    sessions_with_add_to_cart = events_df[events_df["event_type"] == "add_to_cart"]["session_id"].nunique()
-    sessions_with_checkout = events_df[events_df["event_type"] == "checkout"]["session_id"].nunique()
-    sessions_with_purchase = events_df[events_df["event_type"] == "purchase"]["session_id"].nunique()
+    # One grouped pass instead of four filter + nunique scans of the frame
+    sessions_per_stage = events_df.groupby("event_type", observed=True)["session_id"].nunique()
+    sessions_with_product_view = sessions_per_stage.get("product_view", 0)
+    sessions_with_add_to_cart = sessions_per_stage.get("add_to_cart", 0)
+    sessions_with_checkout = sessions_per_stage.get("checkout", 0)
+    sessions_with_purchase = sessions_per_stage.get("purchase", 0)
     
     if sessions_with_product_view > 0:
         conv_rate = (sessions_with_add_to_cart / sessions_with_product_view) * 100
@@ -554,32 +598,32 @@ def validate_and_print_stats(users_df: pd.DataFrame, events_df: pd.DataFrame, or
 
         # Orders by product_category
         print(f"\nOrders by Product Category:")
-        order_categories = orders_df["product_id"].apply(lambda x: get_product_category(x) if pd.notna(x) else None)
+        # LUT gather instead of a Python .apply per row; categorical dtype
+        # keeps the value_counts tabulation on int8 codes
+        order_categories = pd.Series(pd.Categorical(
+            PRODUCT_CATEGORY_LUT[orders_df["product_id"].to_numpy().astype(np.int64)],
+            categories=PRODUCT_CATEGORIES,
+        ))
         category_counts = order_categories.value_counts()
         for cat, count in category_counts.items():
             print(f"  {cat:10s}: {count:8,} ({count/len(orders_df)*100:5.2f}%)")
 
-        # Conversion rate: control vs variant (checkout -> purchase)
+        # Conversion rate: control vs variant (checkout -> purchase).
+        # One crosstab pass over the frame replaces four full-column mask
+        # scans; events without a variant drop out automatically
         print(f"\nA/B Test Conversion (Checkout -> Purchase):")
-        ab_events = events_df[
-            events_df["event_type"].isin(["checkout", "purchase"])
-        ].copy()
-        if "variant" in ab_events.columns:
-            for variant in ["control", "variant"]:
-                checkout_mask = (ab_events["event_type"] == "checkout") & (
-                    ab_events.get("variant") == variant
-                )
-                purchase_mask = (ab_events["event_type"] == "purchase") & (
-                    ab_events.get("variant") == variant
-                )
-                checkouts = checkout_mask.sum()
-                purchases = purchase_mask.sum()
-                conv_rate = (purchases / checkouts * 100) if checkouts > 0 else 0.0
-                print(
-                    f"  {variant:8s}: "
-                    f"checkouts={checkouts:6,}, purchases={purchases:6,}, "
-                    f"conversion={conv_rate:5.2f}%"
-                )
+        ab_tab = pd.crosstab(events_df["event_type"], events_df["variant"]).reindex(
+            index=["checkout", "purchase"], columns=["control", "variant"], fill_value=0
+        )
+        for variant in ["control", "variant"]:
+            checkouts = int(ab_tab.loc["checkout", variant])
+            purchases = int(ab_tab.loc["purchase", variant])
+            conv_rate = (purchases / checkouts * 100) if checkouts > 0 else 0.0
+            print(
+                f"  {variant:8s}: "
+                f"checkouts={checkouts:6,}, purchases={purchases:6,}, "
+                f"conversion={conv_rate:5.2f}%"
+            )
     
     print(f"\nData Quality Checks:")
     missing_sessions = events_df["session_id"].isna().sum()
@@ -605,16 +649,20 @@ def main():
     # Remove internal columns before saving
     users_export = users_df.drop(columns=["is_bot"])
     
-    # Save to CSV
+    # Save to CSV — the three writes run concurrently: pyarrow's writer
+    # releases the GIL, so formatting and disk I/O overlap across files
     print("\nSaving files...")
-    users_export.to_csv(f"{OUTPUT_DIR}/users.csv", index=False)
-    print(f"  [OK] Saved {OUTPUT_DIR}/users.csv")
-    
-    events_df.to_csv(f"{OUTPUT_DIR}/events.csv", index=False)
-    print(f"  [OK] Saved {OUTPUT_DIR}/events.csv")
-    
-    orders_df.to_csv(f"{OUTPUT_DIR}/orders.csv", index=False)
-    print(f"  [OK] Saved {OUTPUT_DIR}/orders.csv")
+    outputs = [
+        (users_export, f"{OUTPUT_DIR}/users.csv"),
+        (events_df, f"{OUTPUT_DIR}/events.csv"),
+        (orders_df, f"{OUTPUT_DIR}/orders.csv"),
+    ]
+    with ThreadPoolExecutor(max_workers=len(outputs)) as executor:
+        futures = [executor.submit(write_csv, df, path) for df, path in outputs]
+        for future in futures:
+            future.result()
+    for _, path in outputs:
+        print(f"  [OK] Saved {path}")
     
     # Validation
     validate_and_print_stats(users_export, events_df, orders_df)
@@ -2,7 +2,7 @@
 Load Raw CSV Data into DuckDB
 
 Loads users, events, and orders CSV files into DuckDB tables with proper
-schema definitions and indexes for analytics queries.
+schema definitions for analytics queries.
 
 Usage:
     python src/load_to_db.py
@@ -10,7 +10,9 @@ Usage:
 
 import os
 import duckdb
-import pandas as pd
+import numpy as np
+import pyarrow.feather as feather
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 
@@ -24,18 +26,184 @@ USERS_CSV = DATA_DIR / "users.csv"
 EVENTS_CSV = DATA_DIR / "events.csv"
 ORDERS_CSV = DATA_DIR / "orders.csv"
 
+# Columnar snapshot of metrics_summary for consumers outside the DB
+# (notebooks, dashboards): Arrow IPC files are memory-mappable, so
+# readers get the stats without opening the DuckDB file at all
+METRICS_ARROW = PROJECT_ROOT / "data" / "metrics_summary.arrow"
+
+# ENUM definitions for low-cardinality columns. Storing these as ENUM
+# instead of VARCHAR keeps a small-int code per row plus one dictionary,
+# so GROUP BY / equality filters compare integers and the columns
+# compress to a fraction of their string footprint. Value sets mirror
+# the constants in data_generator.py.
+ENUM_TYPES = {
+    "device_t": ["mobile", "desktop", "tablet"],
+    "country_t": ["US", "IN", "UK", "DE", "AU"],
+    "loyalty_tier_t": ["bronze", "silver", "gold", "platinum"],
+    "event_type_t": ["visit", "product_view", "add_to_cart", "checkout", "purchase"],
+    "source_t": ["organic", "paid", "email", "referral"],
+    "variant_t": ["control", "variant"],
+    "payment_status_t": ["success", "failed"],
+}
+
+# Typed column specs for the raw CSVs, in file order. The CREATE TABLE
+# DDL and the read_csv columns map are both generated from these, so a
+# type change (e.g. user_id -> BIGINT) is a one-line edit
+USERS_SCHEMA = {
+    "user_id": "INTEGER",
+    "signup_date": "DATE",
+    "device": "device_t",
+    "country": "country_t",
+    "loyalty_tier": "loyalty_tier_t",
+}
+
+EVENTS_SCHEMA = {
+    "event_id": "VARCHAR",
+    "user_id": "INTEGER",
+    "session_id": "VARCHAR",
+    "event_type": "event_type_t",
+    "page": "VARCHAR",
+    "product_id": "INTEGER",
+    "product_category": "VARCHAR",
+    "ts": "TIMESTAMP",
+    "source": "source_t",
+    "device": "device_t",
+    "ab_test_id": "VARCHAR",
+    "variant": "variant_t",
+}
+
+ORDERS_SCHEMA = {
+    "order_id": "VARCHAR",
+    "user_id": "INTEGER",
+    "product_id": "INTEGER",
+    "price": "DOUBLE",
+    "quantity": "INTEGER",
+    "discount_amount": "DOUBLE",
+    "ts": "TIMESTAMP",
+    "payment_status": "payment_status_t",
+}
+
+
+def schema_ddl(schema: dict) -> str:
+    """Render a column spec as CREATE TABLE column DDL."""
+    return ", ".join(f"{column} {dtype}" for column, dtype in schema.items())
+
+
+def schema_columns_arg(schema: dict) -> str:
+    """Render a column spec as a read_csv columns argument."""
+    entries = ", ".join(
+        f"'{column}': '{dtype}'" for column, dtype in schema.items()
+    )
+    return "{" + entries + "}"
+
 
 def connect_db(db_path: Path) -> duckdb.DuckDBPyConnection:
     """
-    Create or connect to DuckDB database.
-    
+    Create or connect to DuckDB database, tuned for bulk loading.
+
+    Uses the same environment overrides as scripts/db_tuning.py
+    (DUCKDB_THREADS, DUCKDB_MEMORY_LIMIT), and additionally relaxes
+    insertion-order preservation: the raw tables have no meaningful row
+    order, and dropping the guarantee lets the parallel CSV reader
+    write row groups as they finish parsing.
+
     Args:
         db_path: Path to database file
-        
+
     Returns:
         DuckDB connection object
     """
-    return duckdb.connect(str(db_path))
+    conn = duckdb.connect(str(db_path))
+
+    threads = os.environ.get("DUCKDB_THREADS") or os.cpu_count()
+    conn.execute(f"PRAGMA threads={threads}")
+
+    memory_limit = os.environ.get("DUCKDB_MEMORY_LIMIT")
+    if memory_limit:
+        conn.execute(f"PRAGMA memory_limit='{memory_limit}'")
+
+    temp_directory = os.environ.get("DUCKDB_TEMP_DIRECTORY")
+    if temp_directory:
+        conn.execute(f"PRAGMA temp_directory='{temp_directory}'")
+
+    conn.execute("PRAGMA preserve_insertion_order=false")
+
+    # Raise the auto-checkpoint threshold so the WAL flush does not
+    # stall the bulk COPYs mid-load; main() issues an explicit
+    # CHECKPOINT once all tables are written
+    conn.execute("PRAGMA wal_autocheckpoint='1GB'")
+
+    return conn
+
+
+def create_enum_types(conn: duckdb.DuckDBPyConnection):
+    """
+    Create the ENUM types used by the raw tables, if not already present.
+
+    Existing types are reused: the value sets are fixed by the data
+    generator, and dropping a type would cascade into tables built from
+    a previous load.
+
+    Args:
+        conn: DuckDB connection
+    """
+    existing = {
+        row[0] for row in conn.execute(
+            "SELECT type_name FROM duckdb_types() WHERE logical_type = 'ENUM'"
+        ).fetchall()
+    }
+    for type_name, values in ENUM_TYPES.items():
+        if type_name not in existing:
+            quoted_values = ", ".join(f"'{value}'" for value in values)
+            conn.execute(f"CREATE TYPE {type_name} AS ENUM ({quoted_values})")
+
+
+def ensure_load_meta(conn: duckdb.DuckDBPyConnection):
+    """Create the _load_meta bookkeeping table if it does not exist."""
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS _load_meta (
+            table_name VARCHAR PRIMARY KEY,
+            csv_mtime DOUBLE,
+            csv_size BIGINT,
+            loaded_at TIMESTAMP
+        )
+    """)
+
+
+def csv_is_unchanged(conn: duckdb.DuckDBPyConnection, table_name: str,
+                     csv_path: Path) -> bool:
+    """
+    True when the CSV behind a table matches the stat recorded at the
+    last load, meaning the reload can be skipped.
+
+    Follows the same staleness pattern as _build_meta in
+    scripts/materialize_tables.py: compare cheap signatures (mtime and
+    size here), rebuild on any difference.
+
+    Args:
+        conn: DuckDB connection
+        table_name: Raw table the CSV feeds
+        csv_path: Path to the CSV file
+
+    Returns:
+        Whether the recorded signature matches the file on disk
+    """
+    row = conn.execute(
+        "SELECT csv_mtime, csv_size FROM _load_meta WHERE table_name = ?",
+        [table_name],
+    ).fetchone()
+    stat = csv_path.stat()
+    return row is not None and row[0] == stat.st_mtime and row[1] == stat.st_size
+
+
+def record_load_meta(conn: duckdb.DuckDBPyConnection, table_name: str,
+                     csv_path: Path):
+    """Upsert the _load_meta row for a freshly loaded table."""
+    stat = csv_path.stat()
+    conn.execute(
+        "INSERT OR REPLACE INTO _load_meta VALUES (?, ?, ?, now())",
+        [table_name, stat.st_mtime, stat.st_size],
+    )
 
 
 def load_users_table(conn: duckdb.DuckDBPyConnection, csv_path: Path):
@@ -47,26 +215,18 @@ def load_users_table(conn: duckdb.DuckDBPyConnection, csv_path: Path):
         csv_path: Path to users.csv
     """
     print("Loading users table...")
-    
-    # Read CSV
-    df = pd.read_csv(csv_path)
-    
-    # Create table with explicit schema
-    conn.execute("""
-        CREATE OR REPLACE TABLE users_raw AS
-        SELECT
-            CAST(user_id AS INTEGER) AS user_id,
-            CAST(signup_date AS DATE) AS signup_date,
-            CAST(device AS VARCHAR) AS device,
-            CAST(country AS VARCHAR) AS country,
-            CAST(loyalty_tier AS VARCHAR) AS loyalty_tier
-        FROM df
-    """)
-    
-    # Create index
-    conn.execute("CREATE INDEX IF NOT EXISTS idx_users_user_id ON users_raw(user_id)")
-    
-    print(f"  Loaded {len(df):,} users")
+
+    # Declare the schema up front and stream the CSV into it with COPY:
+    # the parallel reader parses straight to the final column types and
+    # overlaps parsing with column-store encoding, with no intermediate
+    # sniffed-then-cast result
+    conn.execute(f"CREATE OR REPLACE TABLE users_raw ({schema_ddl(USERS_SCHEMA)})")
+    conn.execute(
+        f"COPY users_raw FROM '{csv_path.as_posix()}' (FORMAT CSV, HEADER)"
+    )
+
+    count = conn.execute("SELECT COUNT(*) FROM users_raw").fetchone()[0]
+    print(f"  Loaded {count:,} users")
 
 
 def load_events_table(conn: duckdb.DuckDBPyConnection, csv_path: Path):
@@ -78,193 +238,229 @@ def load_events_table(conn: duckdb.DuckDBPyConnection, csv_path: Path):
         csv_path: Path to events.csv
     """
     print("Loading events table...")
-    
-    # Read CSV
-    df = pd.read_csv(csv_path)
-    
-    # Handle nullable columns (convert empty strings to None)
-    df['session_id'] = df['session_id'].replace('', None)
-    df['product_id'] = df['product_id'].replace('', None)
-    df['ab_test_id'] = df['ab_test_id'].replace('', None)
-    df['variant'] = df['variant'].replace('', None)
-    
-    # Create table with explicit schema
-    conn.execute("""
-        CREATE OR REPLACE TABLE events_raw AS
-        SELECT
-            CAST(event_id AS VARCHAR) AS event_id,
-            CAST(user_id AS INTEGER) AS user_id,
-            CAST(session_id AS VARCHAR) AS session_id,
-            CAST(event_type AS VARCHAR) AS event_type,
-            CAST(page AS VARCHAR) AS page,
-            CAST(product_id AS INTEGER) AS product_id,
-            CAST(product_category AS VARCHAR) AS product_category,
-            CAST(ts AS TIMESTAMP) AS ts,
-            CAST(source AS VARCHAR) AS source,
-            CAST(device AS VARCHAR) AS device,
-            CAST(ab_test_id AS VARCHAR) AS ab_test_id,
-            CAST(variant AS VARCHAR) AS variant
-        FROM df
-    """)
-    
-    # Create indexes
-    conn.execute("CREATE INDEX IF NOT EXISTS idx_events_user_id ON events_raw(user_id)")
-    conn.execute("CREATE INDEX IF NOT EXISTS idx_events_ts ON events_raw(ts)")
-    
-    print(f"  Loaded {len(df):,} events")
+
+    # Declare the schema up front and stream the CSV into it with COPY.
+    # Empty fields (quoted or not) parse as NULL at the reader level,
+    # which covers the nullable session/product/A-B columns without any
+    # post-hoc NULLIF pass
+    conn.execute(f"CREATE OR REPLACE TABLE events_raw ({schema_ddl(EVENTS_SCHEMA)})")
+    conn.execute(
+        f"COPY events_raw FROM '{csv_path.as_posix()}' (FORMAT CSV, HEADER)"
+    )
+
+    count = conn.execute("SELECT COUNT(*) FROM events_raw").fetchone()[0]
+    print(f"  Loaded {count:,} events")
 
 
 def load_orders_table(conn: duckdb.DuckDBPyConnection, csv_path: Path):
     """
     Load orders CSV into orders_raw table with proper schema.
-    Adds product_category by joining with events_raw.
+    Adds product_category via the product_categories lookup table
+    (pre-aggregated from events_raw).
     
     Args:
         conn: DuckDB connection
         csv_path: Path to orders.csv
     """
     print("Loading orders table...")
-    
-    # Read CSV
-    df = pd.read_csv(csv_path)
-    
-    # Create temporary table first
+
+    # Build the product -> category dictionary once, keyed uniquely on
+    # product_id. ANY_VALUE guarantees one row per product even if a
+    # product were ever re-categorized in events, so the join below can
+    # never multiply order rows the way DISTINCT on both columns could
     conn.execute("""
-        CREATE OR REPLACE TABLE orders_temp AS
+        CREATE OR REPLACE TABLE product_categories AS
         SELECT
-            CAST(order_id AS VARCHAR) AS order_id,
-            CAST(user_id AS INTEGER) AS user_id,
-            CAST(product_id AS INTEGER) AS product_id,
-            CAST(price AS DOUBLE) AS price,
-            CAST(quantity AS INTEGER) AS quantity,
-            CAST(discount_amount AS DOUBLE) AS discount_amount,
-            CAST(ts AS TIMESTAMP) AS ts,
-            CAST(payment_status AS VARCHAR) AS payment_status
-        FROM df
+            product_id,
+            ANY_VALUE(product_category) AS product_category
+        FROM events_raw
+        WHERE product_id IS NOT NULL
+        AND product_category IS NOT NULL
+        GROUP BY product_id
     """)
-    
-    # Create final table with product_category from events
-    conn.execute("""
+
+    # Single statement: the typed CSV read and the category join run as
+    # one pipelined plan, so the intermediate orders shape is never
+    # materialized to disk the way the old orders_temp staging table
+    # was. The columns map makes the reader parse each field straight to
+    # its final type, so the projection needs no CAST pass at all
+    conn.execute(f"""
         CREATE OR REPLACE TABLE orders_raw AS
+        WITH o AS (
+            SELECT *
+            FROM read_csv('{csv_path.as_posix()}', header = true,
+                          columns = {schema_columns_arg(ORDERS_SCHEMA)})
+        )
         SELECT
             o.order_id,
             o.user_id,
             o.product_id,
-            COALESCE(e.product_category, 'unknown') AS product_category,
+            COALESCE(c.product_category, 'unknown') AS product_category,
             o.price,
             o.quantity,
             o.discount_amount,
             o.ts,
             o.payment_status
-        FROM orders_temp o
-        LEFT JOIN (
-            SELECT DISTINCT product_id, product_category
-            FROM events_raw
-            WHERE product_id IS NOT NULL
-            AND product_category IS NOT NULL
-        ) e ON o.product_id = e.product_id
+        FROM o
+        LEFT JOIN product_categories c USING (product_id)
+    """)
+
+
+    count = conn.execute("SELECT COUNT(*) FROM orders_raw").fetchone()[0]
+    print(f"  Loaded {count:,} orders")
+
+
+def build_metrics_summary(conn: duckdb.DuckDBPyConnection):
+    """
+    Materialize the load-time validation aggregates as tables.
+
+    row_counts and metrics_summary persist the per-table counts and the
+    fused events_raw aggregates, so downstream consumers (and re-runs of
+    the validation printout) read a handful of summary rows instead of
+    rescanning the raw tables.
+
+    Args:
+        conn: DuckDB connection
+    """
+    conn.execute("""
+        CREATE OR REPLACE TABLE row_counts AS
+        SELECT 'users_raw' AS table_name, COUNT(*) AS row_count FROM users_raw
+        UNION ALL
+        SELECT 'events_raw', COUNT(*) FROM events_raw
+        UNION ALL
+        SELECT 'orders_raw', COUNT(*) FROM orders_raw
     """)
-    
-    # Drop temporary table
-    conn.execute("DROP TABLE IF EXISTS orders_temp")
-    
-    # Create indexes
-    conn.execute("CREATE INDEX IF NOT EXISTS idx_orders_user_id ON orders_raw(user_id)")
-    conn.execute("CREATE INDEX IF NOT EXISTS idx_orders_ts ON orders_raw(ts)")
-    
-    print(f"  Loaded {len(df):,} orders")
+
+    # One scan of events_raw produces the event-type distribution,
+    # checkout A/B coverage, per-variant purchase counts and per-variant
+    # conversion sessions that used to take four separate queries
+    conn.execute("""
+        CREATE OR REPLACE TABLE metrics_summary AS
+        SELECT
+            GROUPING(variant) AS by_event_type,
+            event_type,
+            variant,
+            COUNT(*) AS cnt,
+            COUNT(*) FILTER (WHERE ab_test_id IS NOT NULL) AS with_ab,
+            COUNT(*) FILTER (WHERE event_type = 'purchase') AS purchases,
+            COUNT(DISTINCT session_id) FILTER (WHERE event_type = 'checkout') AS checkout_sessions,
+            COUNT(DISTINCT session_id) FILTER (WHERE event_type = 'purchase') AS purchase_sessions
+        FROM events_raw
+        GROUP BY GROUPING SETS ((event_type), (variant))
+    """)
+
+    # Snapshot the summary as an uncompressed Arrow IPC file so
+    # downstream tools can memory-map it (pa.ipc.open_file) without
+    # touching the database
+    table = conn.execute("""
+        SELECT
+            by_event_type,
+            CAST(event_type AS VARCHAR) AS event_type,
+            CAST(variant AS VARCHAR) AS variant,
+            cnt,
+            with_ab,
+            purchases,
+            checkout_sessions,
+            purchase_sessions
+        FROM metrics_summary
+    """).to_arrow_table()
+    METRICS_ARROW.parent.mkdir(parents=True, exist_ok=True)
+    feather.write_feather(table, str(METRICS_ARROW), compression='uncompressed')
 
 
 def validate_data(conn: duckdb.DuckDBPyConnection):
     """
     Print validation statistics after loading data.
-    
+
+    Reads the persisted row_counts / metrics_summary tables built by
+    build_metrics_summary rather than rescanning the raw tables.
+
     Args:
         conn: DuckDB connection
     """
     print("\n" + "="*60)
     print("VALIDATION STATISTICS")
     print("="*60)
-    
-    # Row counts
+
+    # Row counts from the persisted summary table
     print("\nRow Counts:")
-    users_count = conn.execute("SELECT COUNT(*) FROM users_raw").fetchone()[0]
-    events_count = conn.execute("SELECT COUNT(*) FROM events_raw").fetchone()[0]
-    orders_count = conn.execute("SELECT COUNT(*) FROM orders_raw").fetchone()[0]
-    
-    print(f"  users_raw:  {users_count:,}")
+    counts = dict(conn.execute(
+        "SELECT table_name, row_count FROM row_counts"
+    ).fetchall())
+    events_count = counts['events_raw']
+
+    print(f"  users_raw:  {counts['users_raw']:,}")
     print(f"  events_raw: {events_count:,}")
-    print(f"  orders_raw: {orders_count:,}")
-    
-    # Event type distribution
+    print(f"  orders_raw: {counts['orders_raw']:,}")
+
+    # The stats are fetched as an Arrow table so DuckDB's columnar
+    # vectors flow out without per-row Python tuple construction. The
+    # ENUM label columns are cast to VARCHAR here because numpy has no
+    # dictionary type and the null slots must survive the conversion
+    stats = conn.execute("""
+        SELECT
+            by_event_type,
+            CAST(event_type AS VARCHAR) AS event_type,
+            CAST(variant AS VARCHAR) AS variant,
+            cnt,
+            with_ab,
+            purchases,
+            checkout_sessions,
+            purchase_sessions
+        FROM metrics_summary
+        ORDER BY by_event_type DESC, cnt DESC, variant
+    """).to_arrow_table()
+
+    grouping = stats.column('by_event_type').to_numpy()
+    event_types = stats.column('event_type').to_numpy(zero_copy_only=False)
+    variants = stats.column('variant').to_numpy(zero_copy_only=False)
+    cnt = stats.column('cnt').to_numpy()
+    with_ab = stats.column('with_ab').to_numpy()
+    purchases = stats.column('purchases').to_numpy()
+    checkout_sessions = stats.column('checkout_sessions').to_numpy()
+    purchase_sessions = stats.column('purchase_sessions').to_numpy()
+
+    et_idx = np.flatnonzero(grouping == 1)
+    var_idx = np.flatnonzero(
+        (grouping == 0) & np.array([v is not None for v in variants])
+    )
+    var_idx = var_idx[np.argsort(variants[var_idx].astype(str))]
+
+    # Event type distribution: one broadcast divide instead of a Python
+    # float division per printed row
     print("\nEvent Type Distribution:")
-    event_types = conn.execute("""
-        SELECT event_type, COUNT(*) as cnt
-        FROM events_raw
-        GROUP BY event_type
-        ORDER BY cnt DESC
-    """).fetchall()
-    
-    for event_type, count in event_types:
-        pct = (count / events_count * 100) if events_count > 0 else 0
+    pcts = cnt[et_idx] * (100.0 / events_count) if events_count > 0 else \
+        np.zeros(et_idx.size)
+    for event_type, count, pct in zip(event_types[et_idx], cnt[et_idx], pcts):
         print(f"  {event_type:15s}: {count:8,} ({pct:5.2f}%)")
-    
+
     # A/B test checkout events
     print("\nA/B Test Coverage:")
-    checkout_with_ab = conn.execute("""
-        SELECT COUNT(*) 
-        FROM events_raw 
-        WHERE event_type = 'checkout' 
-        AND ab_test_id IS NOT NULL
-    """).fetchone()[0]
-    
-    total_checkouts = conn.execute("""
-        SELECT COUNT(*) 
-        FROM events_raw 
-        WHERE event_type = 'checkout'
-    """).fetchone()[0]
-    
+    checkout_idx = et_idx[event_types[et_idx] == 'checkout']
+    total_checkouts = int(cnt[checkout_idx[0]]) if checkout_idx.size else 0
+    checkout_with_ab = int(with_ab[checkout_idx[0]]) if checkout_idx.size else 0
+
     print(f"  Checkout events with ab_test_id: {checkout_with_ab:,} / {total_checkouts:,}")
     if total_checkouts > 0:
         print(f"  Coverage: {checkout_with_ab/total_checkouts*100:.2f}%")
-    
+
     # Control vs Variant purchases
     print("\nA/B Test Purchase Comparison:")
-    ab_purchases = conn.execute("""
-        SELECT 
-            variant,
-            COUNT(*) as purchase_count
-        FROM events_raw
-        WHERE event_type = 'purchase'
-        AND variant IS NOT NULL
-        GROUP BY variant
-        ORDER BY variant
-    """).fetchall()
-    
-    if ab_purchases:
-        for variant, count in ab_purchases:
-            print(f"  {variant:10s}: {count:8,} purchases")
-        
-        # Calculate conversion rates if we have checkout data
-        conversion_data = conn.execute("""
-            SELECT 
-                e.variant,
-                COUNT(DISTINCT CASE WHEN e.event_type = 'checkout' THEN e.session_id END) as checkouts,
-                COUNT(DISTINCT CASE WHEN e.event_type = 'purchase' THEN e.session_id END) as purchases
-            FROM events_raw e
-            WHERE e.variant IS NOT NULL
-            AND e.event_type IN ('checkout', 'purchase')
-            GROUP BY e.variant
-        """).fetchall()
-        
-        if conversion_data:
-            print("\n  Conversion Rates (Checkout -> Purchase):")
-            for variant, checkouts, purchases in conversion_data:
-                conv_rate = (purchases / checkouts * 100) if checkouts > 0 else 0
-                print(f"    {variant:10s}: {purchases:,} / {checkouts:,} = {conv_rate:.2f}%")
+    if var_idx.size:
+        for i in var_idx:
+            print(f"  {variants[i]:10s}: {purchases[i]:8,} purchases")
+
+        print("\n  Conversion Rates (Checkout -> Purchase):")
+        for i in var_idx:
+            conv_rate = (
+                purchase_sessions[i] / checkout_sessions[i] * 100
+                if checkout_sessions[i] > 0 else 0
+            )
+            print(f"    {variants[i]:10s}: {purchase_sessions[i]:,} / "
+                  f"{checkout_sessions[i]:,} = {conv_rate:.2f}%")
     else:
         print("  No A/B test purchases found")
-    
+
     print("\n" + "="*60)
 
 
@@ -287,14 +483,61 @@ def main():
     
     # Connect to database
     conn = connect_db(DB_PATH)
-    
+
     try:
-        # Load tables
-        load_users_table(conn, USERS_CSV)
-        load_events_table(conn, EVENTS_CSV)
-        load_orders_table(conn, ORDERS_CSV)
-        
-        # Validate
+        # Ensure ENUM types and load bookkeeping exist before the tables
+        create_enum_types(conn)
+        ensure_load_meta(conn)
+
+        # Fast path: skip tables whose CSV is unchanged since last load.
+        # orders_raw also depends on events_raw (category lookup), so an
+        # events reload forces the orders rebuild too
+        users_fresh = csv_is_unchanged(conn, 'users_raw', USERS_CSV)
+        events_fresh = csv_is_unchanged(conn, 'events_raw', EVENTS_CSV)
+        orders_fresh = events_fresh and csv_is_unchanged(conn, 'orders_raw', ORDERS_CSV)
+
+        # users and events are independent, so their loads run
+        # concurrently on separate cursors of the same connection —
+        # DuckDB overlaps the two CSV parses on its thread pool. orders
+        # stays sequential because it joins against events_raw
+        pending = []
+        if users_fresh:
+            print("Users CSV unchanged, skipping reload")
+        else:
+            pending.append((load_users_table, 'users_raw', USERS_CSV))
+
+        if events_fresh:
+            print("Events CSV unchanged, skipping reload")
+        else:
+            pending.append((load_events_table, 'events_raw', EVENTS_CSV))
+
+        if pending:
+            with ThreadPoolExecutor(max_workers=len(pending)) as executor:
+                futures = [
+                    executor.submit(loader, conn.cursor(), csv_path)
+                    for loader, _, csv_path in pending
+                ]
+                for future in futures:
+                    future.result()
+            for _, table_name, csv_path in pending:
+                record_load_meta(conn, table_name, csv_path)
+
+        if orders_fresh:
+            print("Orders CSV unchanged, skipping reload")
+        else:
+            load_orders_table(conn, ORDERS_CSV)
+            record_load_meta(conn, 'orders_raw', ORDERS_CSV)
+
+        # Materialize summary tables, then validate from them. The
+        # summaries only need rebuilding when something was reloaded
+        if not (users_fresh and events_fresh and orders_fresh):
+            build_metrics_summary(conn)
+
+            # Flush everything to the database file in one go now that
+            # the write burst is over (pairs with the raised
+            # wal_autocheckpoint threshold in connect_db)
+            conn.execute("CHECKPOINT")
+
         validate_data(conn)
         
         print("\n[SUCCESS] Data loading complete!")